@@ -0,0 +1,659 @@
+"""
+Benchmarks for large part counts, to run from Kit's Script Editor:
+
+from syntway.model_exploder import bench
+bench.bench_writers()
+bench.bench_reset()
+bench.bench_notices()
+bench.bench_discovery()
+bench.bench_capture()
+bench.bench_fast_bounds()
+bench.bench_capture_threads()
+"""
+
+import gc
+import os
+import time
+
+import numpy as np
+
+from pxr import Gf, Sdf, Tf, Usd, UsdGeom, UsdSkel, Vt
+
+from .libs.usd_utils import set_prim_translation, create_edit_context, get_prim_transform
+from .writer import WritePlan, write_plans, write_plans_sdf
+from .snapshot import XformSnapshot, restore_snapshots
+from .parts import PartTable
+from .discovery import find_parts, AVOID_CHILDREN_PRIM_TYPES
+from .capture import capture_prims, BOUNDS_EXTENT, BOUNDS_BBOX_CACHE
+from .libs.usd_cache import WorldToParentCache
+
+
+PART_COUNTS = [10_000, 100_000, 500_000]
+RESET_PART_COUNTS = [10_000]
+NOTICE_PART_COUNTS = [10_000]
+CAPTURE_PART_COUNTS = [100_000]
+ASSEMBLY_PART_COUNTS = [20_000]
+ASSEMBLY_MESHES = 10  # per part
+EXTENT_FRACTION = 0.9  # of parts with an authored extentsHint
+CAPTURE_THREAD_COUNTS = [0, 1, 2, 4, 8]
+NOTICES = 200  # per flood
+GROUP_SIZE = 1000  # parts per parent Xform
+FRAMES = 3
+# name: (branches, depth, leaves per level)
+DISCOVERY_TREES = {"deep": (20, 500, 2), "deeper": (2, 5000, 2), "wide": (100, 1, 1000)}
+
+
+
+def make_parts_stage(count, group_size=GROUP_SIZE, type_name="Xform"):
+    """In-memory stage with count parts of type_name, each with a translate op, grouped under parent Xforms.
+    Returns (stage, part paths).
+    """
+
+    stage = Usd.Stage.CreateInMemory()
+    layer = stage.GetRootLayer()
+
+    paths = []
+
+    with Sdf.ChangeBlock():
+        root = Sdf.CreatePrimInLayer(layer, "/Parts")
+        root.specifier = Sdf.SpecifierDef
+        root.typeName = "Xform"
+
+        for index in range(count):
+            group_path = Sdf.Path(f"/Parts/G{index // group_size}")
+            if index % group_size == 0:
+                group = Sdf.CreatePrimInLayer(layer, group_path)
+                group.specifier = Sdf.SpecifierDef
+                group.typeName = "Xform"
+
+            path = group_path.AppendChild(f"P{index}")
+            prim_spec = Sdf.CreatePrimInLayer(layer, path)
+            prim_spec.specifier = Sdf.SpecifierDef
+            prim_spec.typeName = type_name
+
+            attr = Sdf.AttributeSpec(prim_spec, "xformOp:translate", Sdf.ValueTypeNames.Double3)
+            attr.default = Gf.Vec3d(index, 0., 0.)
+
+            order = Sdf.AttributeSpec(prim_spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray,
+                                      Sdf.VariabilityUniform)
+            order.default = ["xformOp:translate"]
+
+            paths.append(path)
+
+    return stage, paths
+
+
+
+def _write_set_prim_translation(stage, paths, values, time_code):
+    """The per-prim Usd path: edit context and op stack lookup for every part"""
+
+    with Sdf.ChangeBlock():
+        for path, trans in zip(paths, values):
+            prim = stage.GetPrimAtPath(path)
+            with create_edit_context(path, stage):
+                set_prim_translation(prim, trans, sdf_change_block=2, time_code=time_code)
+
+
+
+def _time_frames(write_fn, frames):
+    """Best time of frames calls to write_fn(frame), as timeit does"""
+
+    best = None
+    for frame in range(frames):
+        start = time.perf_counter()
+        write_fn(frame)
+        secs = time.perf_counter() - start
+        best = secs if best is None else min(best, secs)
+
+    return best
+
+
+
+def bench_writers(counts=PART_COUNTS, frames=FRAMES):
+    """Time explode writes of all parts with each backend, as when dragging the distance slider.
+    Returns {count: {backend: seconds per frame}}.
+    """
+
+    time_code = Usd.TimeCode.Default()
+
+    results = {}
+
+    for count in counts:
+        stage, paths = make_parts_stage(count)
+
+        res = results[count] = {}
+
+        def write_usd(frame):
+            values = [Gf.Vec3d(index, frame, 0.) for index in range(count)]
+            _write_set_prim_translation(stage, paths, values, time_code)
+
+        res["set_prim_translation"] = _time_frames(write_usd, frames)
+
+        start = time.perf_counter()
+        plans = [WritePlan(stage.GetPrimAtPath(path), stage, time_code) for path in paths]
+        res["plans"] = time.perf_counter() - start  # one-time, at capture
+
+        def write_plans_usd(frame):
+            write_plans([(plan, (index, frame, 0.)) for index, plan in enumerate(plans)], time_code, stage)
+
+        res["write_plans"] = _time_frames(write_plans_usd, frames)
+
+        def write_plans_layer(frame):
+            write_plans_sdf([(plan, (index, frame, 0.)) for index, plan in enumerate(plans)], time_code, stage)
+
+        res["write_plans_sdf"] = _time_frames(write_plans_layer, frames)
+
+        base = res["set_prim_translation"]
+        print(f"{count} parts, best of {frames} frames:")
+        for name, secs in res.items():
+            speedup = "" if name == "plans" else f"  x{base / max(secs, 1e-9):.1f}"
+            print(f"  {name:<22}{secs * 1000.:10.1f} ms{speedup}")
+
+    return results
+
+
+
+def bench_reset(counts=RESET_PART_COUNTS):
+    """Time restoring all parts to their initial values on the same stage, after the same explode write:
+    TransformPrimCommand per part vs snapshot restore. Snapshots are taken before the first write.
+    Checks if each leaves the root layer exactly as it was. Returns {count: {method: seconds}}.
+    """
+
+    from omni.usd.commands import TransformPrimCommand
+    from pxr import UsdGeom
+
+    time_code = Usd.TimeCode.Default()
+
+    results = {}
+
+    for count in counts:
+        stage, paths = make_parts_stage(count)
+        root_layer = stage.GetRootLayer()
+
+        initial = root_layer.ExportToString()
+
+        plans = [WritePlan(stage.GetPrimAtPath(path), stage, time_code) for path in paths]
+        changes = [(plan, (index, 1., 0.)) for index, plan in enumerate(plans)]
+
+        res = results[count] = {}
+        exact = {}
+
+        # initial values, before anything is written: one-time, at capture
+        xform_cache = UsdGeom.XformCache(time_code)
+        lmats = [get_prim_transform(plan.prim, False, xform_cache, time_code) for plan in plans]
+
+        start = time.perf_counter()
+        snapshots = [XformSnapshot(plan, stage) for plan in plans]
+        res["snapshot"] = time.perf_counter() - start
+
+        write_plans(changes, time_code, stage)
+
+        start = time.perf_counter()
+        for plan, lmat in zip(plans, lmats):
+            TransformPrimCommand(path=plan.path.pathString, new_transform_matrix=lmat, time_code=time_code).do()
+        res["TransformPrimCommand"] = time.perf_counter() - start
+        exact["TransformPrimCommand"] = root_layer.ExportToString() == initial
+
+        # the same exploded state again, from the initial one
+        root_layer.ImportFromString(initial)
+        write_plans(changes, time_code, stage)
+
+        start = time.perf_counter()
+        restore_snapshots(list(zip(plans, snapshots)))
+        res["restore_snapshots"] = time.perf_counter() - start
+        exact["restore_snapshots"] = root_layer.ExportToString() == initial
+
+        base = res["TransformPrimCommand"]
+        print(f"{count} parts:")
+        for name, secs in res.items():
+            speedup = "" if name == "snapshot" else f"  x{base / max(secs, 1e-9):.1f}"
+            restored = f"  restored exactly: {exact[name]}" if name in exact else ""
+            print(f"  {name:<22}{secs * 1000.:10.1f} ms{speedup}{restored}")
+
+    return results
+
+
+
+def _match_prefix_scan(parts, changed_paths):
+    """The previous lookup: every part path against every changed path, as strings"""
+
+    matched = set()
+    for n in changed_paths:
+        ch_path = n.GetPrimPath().pathString
+        for path in parts.paths:
+            if path.pathString.startswith(ch_path):
+                matched.add(path)
+
+    return matched
+
+
+
+def _match_index(parts, changed_paths):
+    matched = set()
+    for n in changed_paths:
+        for row in parts.rows_under(n.GetPrimPath()):
+            matched.add(parts.paths[row])
+
+    return matched
+
+
+
+def bench_notices(counts=NOTICE_PART_COUNTS, notices=NOTICES):
+    """Flood a session of count parts with ObjectsChanged notices, timing the lookup of the parts they affect,
+    as Engine._on_stage_objects_changed() does it: the previous prefix scan vs PartTable.rows_under().
+    Floods: single part moves, parent group moves, each in its own notice, then one notice moving all parts.
+    Returns {count: {flood: {method: seconds}}}, None where the scan is too slow to run.
+    """
+
+    results = {}
+
+    for count in counts:
+        stage, paths = make_parts_stage(count)
+        layer = stage.GetRootLayer()
+
+        parts = PartTable()
+        prims = [stage.GetPrimAtPath(path) for path in paths]
+        parts.set_rows(prims, np.zeros((count, 3)), np.zeros((count, 3)), np.zeros((count, 3)), 
+                       [None] * count, np.tile(np.identity(4), (count, 1, 1)), [None] * count, 
+                       np.zeros((count, 2, 3)), np.zeros(count, dtype=bool))
+
+        group_paths = sorted({path.GetParentPath() for path in paths})
+        with Sdf.ChangeBlock():
+            for group_path in group_paths:
+                Sdf.AttributeSpec(layer.GetPrimAtPath(group_path), "xformOp:translate", Sdf.ValueTypeNames.Double3)
+
+        def move(attr_paths, frame):
+            with Sdf.ChangeBlock():
+                for attr_path in attr_paths:
+                    layer.GetAttributeAtPath(attr_path).default = Gf.Vec3d(frame, 0., 0.)
+
+        step = max(count // notices, 1)
+        part_attrs = [paths[i].AppendProperty("xformOp:translate") for i in range(0, count, step)][:notices]
+        group_attrs = [p.AppendProperty("xformOp:translate") for p in group_paths][:notices]
+
+        floods = {
+            "part": lambda frame: [move([a], frame) for a in part_attrs],
+            "group": lambda frame: [move([a], frame) for a in group_attrs],
+            "all": lambda frame: move([p.AppendProperty("xformOp:translate") for p in paths], frame),
+        }
+
+        res = results[count] = {}
+
+        frame = count  # a new value for every write, so that each one sends notices
+
+        for flood, write_fn in floods.items():
+            res[flood] = {}
+            matched = {}
+
+            for name, match_fn in [("prefix_scan", _match_prefix_scan), ("index", _match_index)]:
+                if name == "prefix_scan" and flood == "all":  # count * count string tests
+                    res[flood][name] = None
+                    continue
+
+                secs = [0.]
+                found = matched[name] = set()
+
+                def on_changed(notice, sender):
+                    start = time.perf_counter()
+                    changed_paths = set(Sdf.Path.GetAbsoluteRootOrPrimPath(i) 
+                                        for i in notice.GetChangedInfoOnlyPaths())
+                    found.update(match_fn(parts, changed_paths))
+                    secs[0] += time.perf_counter() - start
+
+                listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, on_changed, stage)
+                frame += 1
+                write_fn(frame)
+                listener.Revoke()
+
+                res[flood][name] = secs[0]
+
+            wrong = ""
+            if "prefix_scan" in matched:
+                wrong = f", {len(matched['prefix_scan'] - matched['index'])} wrong matches by the prefix scan"
+
+            print(f"{count} parts, {flood} flood: {len(matched['index'])} parts matched{wrong}")
+            for name, secs in res[flood].items():
+                text = "-" if secs is None else f"{secs * 1000.:.1f} ms"
+                print(f"  {name:<22}{text:>13}")
+
+    return results
+
+
+
+def make_tree_stage(branches, depth, leaves):
+    """In-memory stage with branches chains of depth nested Xforms under /Root, each level holding leaves Cubes.
+    Every chain also has a Camera, a PointInstancer and referencing prims, with Cubes below.
+    Returns the stage.
+    """
+
+    stage = Usd.Stage.CreateInMemory()
+    layer = stage.GetRootLayer()
+
+    def define(path, type_name):
+        prim_spec = Sdf.CreatePrimInLayer(layer, path)
+        prim_spec.specifier = Sdf.SpecifierDef
+        prim_spec.typeName = type_name
+        return prim_spec
+
+    with Sdf.ChangeBlock():
+        define("/Proto", "Xform")
+        define("/Proto/Cube", "Cube")
+        define("/Empty", "Xform")
+
+        define("/Root", "Xform")
+
+        for branch in range(branches):
+            path = Sdf.Path(f"/Root/B{branch}")
+            define(path, "Xform")
+
+            define(path.AppendChild("Cam"), "Camera")
+            define(path.AppendPath("Cam/Cube"), "Cube")
+            define(path.AppendChild("Inst"), "PointInstancer")
+            define(path.AppendPath("Inst/Cube"), "Cube")
+
+            for name, proto in [("Ref", "/Proto"), ("RefEmpty", "/Empty")]:
+                define(path.AppendChild(name), "Xform").referenceList.Prepend(Sdf.Reference(primPath=proto))
+
+            for level in range(depth):
+                for leaf in range(leaves):
+                    define(path.AppendChild(f"C{leaf}"), "Cube")
+                path = path.AppendChild("L")
+                define(path, "Xform")
+
+    return stage
+
+
+
+def _traverse_add_prim(list, prim):
+    """The previous part discovery, recursive"""
+
+    if not prim.IsValid():
+        return
+
+    prim_t = prim.GetTypeName()
+
+    if prim.HasAuthoredReferences():
+        ref_list = []
+        for c in prim.GetChildren():
+            _traverse_add_prim(ref_list, c)
+
+        if ref_list:
+            list += ref_list
+        else:
+            list.append(prim)
+        return
+
+    if prim.IsA(UsdGeom.PointInstancer) or prim.IsA(UsdSkel.Root):
+        list.append(prim)
+        return
+
+    if prim.IsA(UsdGeom.Gprim):
+        list.append(prim)
+
+    if not prim_t in AVOID_CHILDREN_PRIM_TYPES:
+        for c in prim.GetChildren():
+            _traverse_add_prim(list, c)
+
+
+
+def bench_discovery(trees=DISCOVERY_TREES, frames=FRAMES):
+    """Time part discovery below /Root on deep and wide synthetic hierarchies: 
+    the previous recursive traversal vs discovery.find_parts().
+    Returns {tree: {method: seconds}}, None where the recursion limit was hit.
+    """
+
+    results = {}
+
+    for tree, (branches, depth, leaves) in trees.items():
+        stage = make_tree_stage(branches, depth, leaves)
+        root = stage.GetPrimAtPath("/Root")
+
+        found = {}
+
+        def recursive(frame):
+            found["recursive"] = []
+            _traverse_add_prim(found["recursive"], root)
+
+        def prim_range(frame):
+            found["prim_range"] = find_parts([root])
+
+        res = results[tree] = {}
+
+        for name, fn in [("recursive", recursive), ("prim_range", prim_range)]:
+            try:
+                res[name] = _time_frames(fn, frames)
+            except RecursionError:
+                res[name] = None
+                found.pop(name, None)
+
+        same = ""
+        if "recursive" in found:
+            same = f", same parts: {found['recursive'] == found['prim_range']}"
+
+        print(f"{tree}: {branches} x {depth} levels x {leaves} leaves, {len(found['prim_range'])} parts{same}")
+        base = res["recursive"]
+        for name, secs in res.items():
+            text = "recursion limit" if secs is None else f"{secs * 1000.:.1f} ms"
+            speedup = "" if name == "recursive" or base is None else f"  x{base / max(secs, 1e-9):.1f}"
+            print(f"  {name:<22}{text:>16}{speedup}")
+
+    return results
+
+
+
+def _capture_prims_previous(prims, stage, time_code, w2p_cache):
+    """The previous capture: local and world bounds computed separately, op order read again by the snapshot"""
+
+    bbox_cache = UsdGeom.BBoxCache(time_code, [UsdGeom.Tokens.default_])
+
+    ini_wtrans = []
+    ldeltas = []
+    ini_ltrans = []
+    snapshots = []
+    w2ps = []
+    plans = []
+    wbounds = []
+
+    for prim in prims:
+        plan = WritePlan(prim, stage, time_code)
+
+        lbb = bbox_cache.ComputeLocalBound(prim)
+        ltrans = plan.translation
+        ldelta = ltrans - lbb.ComputeCentroid()
+
+        wbb = bbox_cache.ComputeWorldBound(prim)
+        wbb_aa = wbb.ComputeAlignedRange()
+
+        UsdGeom.Xformable(prim).GetXformOpOrderAttr().Get()
+        snapshot = XformSnapshot(plan, stage)
+
+        w2p = w2p_cache.get(prim, time_code)
+
+        ini_wtrans.append(wbb.ComputeCentroid())
+        ldeltas.append(ldelta)
+        ini_ltrans.append(ltrans)
+        snapshots.append(snapshot)
+        w2ps.append(w2p)
+        plans.append(plan)
+        wbounds.append((wbb_aa.GetMin(), wbb_aa.GetMax()))
+
+    return ini_wtrans, ldeltas, ini_ltrans, snapshots, w2ps, plans, wbounds, np.zeros(len(prims), dtype=bool)
+
+
+
+def bench_capture(counts=CAPTURE_PART_COUNTS):
+    """Time capturing count Cube parts, as sel_capture() does after discovery: 
+    the previous capture vs capture.capture_prims().
+    Each runs twice, in forward then reverse order, with a new stage and caches: the best time is kept.
+    Returns {count: {method: seconds}}.
+    """
+
+    time_code = Usd.TimeCode.Default()
+
+    results = {}
+
+    for count in counts:
+        res = results[count] = {}
+        found = {}
+
+        capture_fns = {
+            "previous": _capture_prims_previous,
+            "single_pass": capture_prims,
+        }
+
+        names = list(capture_fns)
+        for name in names + names[::-1]:  # later runs are slower in a grown process
+            capture_fn = capture_fns[name]
+
+            stage, paths = make_parts_stage(count, type_name="Cube")
+            prims = [stage.GetPrimAtPath(path) for path in paths]
+
+            gc.collect()  # not to time the previous run's garbage
+            start = time.perf_counter()
+            ini_wtrans, ldeltas, _, _, _, _, wbounds, _ = capture_fn(prims, stage, time_code, WorldToParentCache())
+            secs = time.perf_counter() - start
+            res[name] = min(res.get(name, secs), secs)
+
+            found[name] = [np.array(values, dtype=float) for values in (ini_wtrans, ldeltas, wbounds)]
+            del stage, prims, ini_wtrans, ldeltas, wbounds, _  # none of this run's objects for the next run's gc
+
+        same = all(np.allclose(a, b) for a, b in zip(found["previous"], found["single_pass"]))
+
+        base = res["previous"]
+        print(f"{count} parts, same centroids and bounds: {same}")
+        for name, secs in res.items():
+            speedup = "" if name == "previous" else f"  x{base / max(secs, 1e-9):.1f}"
+            print(f"  {name:<22}{secs * 1000.:10.1f} ms{speedup}")
+
+    return results
+
+
+
+def make_assembly_parts_stage(count, meshes=ASSEMBLY_MESHES, extent_fraction=EXTENT_FRACTION, 
+                              group_size=GROUP_SIZE):
+    """make_parts_stage() with Xform parts under rotated groups, each holding meshes box Meshes with an extent. 
+    The first extent_fraction of the parts have an authored extentsHint. Returns (stage, part paths).
+    """
+
+    stage, paths = make_parts_stage(count, group_size)
+    layer = stage.GetRootLayer()
+
+    points = Vt.Vec3fArray([Gf.Vec3f(x, y, z) for x in (-1., 2.) for y in (-1., 1.) for z in (0., 3.)])
+    extent = Vt.Vec3fArray([Gf.Vec3f(-1., -1., 0.), Gf.Vec3f(2., 1., 3.)])
+
+    with Sdf.ChangeBlock():
+        for group_path in sorted({path.GetParentPath() for path in paths}):
+            group = layer.GetPrimAtPath(group_path)
+            attr = Sdf.AttributeSpec(group, "xformOp:rotateXYZ", Sdf.ValueTypeNames.Double3)
+            attr.default = Gf.Vec3d(30., 45., 0.)
+            order = Sdf.AttributeSpec(group, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, Sdf.VariabilityUniform)
+            order.default = ["xformOp:rotateXYZ"]
+
+        for index, path in enumerate(paths):
+            for mesh in range(meshes):
+                prim_spec = Sdf.CreatePrimInLayer(layer, path.AppendChild(f"M{mesh}"))
+                prim_spec.specifier = Sdf.SpecifierDef
+                prim_spec.typeName = "Mesh"
+                Sdf.AttributeSpec(prim_spec, "points", Sdf.ValueTypeNames.Point3fArray).default = points
+                Sdf.AttributeSpec(prim_spec, "extent", Sdf.ValueTypeNames.Float3Array).default = extent
+
+                attr = Sdf.AttributeSpec(prim_spec, "xformOp:translate", Sdf.ValueTypeNames.Double3)
+                attr.default = Gf.Vec3d(mesh, 0., 0.)
+                order = Sdf.AttributeSpec(prim_spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, 
+                                          Sdf.VariabilityUniform)
+                order.default = ["xformOp:translate"]
+
+            if index < count * extent_fraction:
+                hint = Vt.Vec3fArray([Gf.Vec3f(-1., -1., 0.), Gf.Vec3f(meshes + 1., 1., 3.)])
+                Sdf.AttributeSpec(layer.GetPrimAtPath(path), "extentsHint", 
+                                  Sdf.ValueTypeNames.Float3Array).default = hint
+
+    return stage, paths
+
+
+
+def bench_fast_bounds(counts=ASSEMBLY_PART_COUNTS, meshes=ASSEMBLY_MESHES, extent_fraction=EXTENT_FRACTION):
+    """Time capturing count assembly parts of meshes Meshes each, with bounds from UsdGeom.BBoxCache 
+    vs fast bounds from authored extents, where extent_fraction of the parts have an extentsHint.
+    Returns {count: {mode: seconds}}.
+    """
+
+    time_code = Usd.TimeCode.Default()
+
+    results = {}
+
+    for count in counts:
+        res = results[count] = {}
+        found = {}
+
+        stage, paths = make_assembly_parts_stage(count, meshes, extent_fraction)
+        prims = [stage.GetPrimAtPath(path) for path in paths]
+
+        counts_by_source = {}  # of fast_bounds
+
+        names = ["bbox_cache", "fast_bounds"]
+        for name in names + names[::-1]:
+            gc.collect()
+            start = time.perf_counter()
+            fast_bounds = name == "fast_bounds"
+            ini_wtrans, ldeltas, _, _, _, _, wbounds, _ = capture_prims(prims, stage, time_code, WorldToParentCache(),
+                                                                         fast_bounds, 
+                                                                         counts_by_source if fast_bounds else None)
+            secs = time.perf_counter() - start
+            res[name] = min(res.get(name, secs), secs)
+
+            found[name] = [np.array(values, dtype=float) for values in (ini_wtrans, ldeltas, wbounds)]
+            del ini_wtrans, ldeltas, wbounds
+
+        same = all(np.allclose(a, b) for a, b in zip(found["bbox_cache"], found["fast_bounds"]))
+
+        base = res["bbox_cache"]
+        print(f"{count} parts, {counts_by_source[BOUNDS_EXTENT]} by extent, "
+              f"{counts_by_source[BOUNDS_BBOX_CACHE]} by BBoxCache, same centroids and bounds: {same}")
+        for name, secs in res.items():
+            speedup = "" if name == "bbox_cache" else f"  x{base / max(secs, 1e-9):.1f}"
+            print(f"  {name:<22}{secs * 1000.:10.1f} ms{speedup}")
+
+    return results
+
+
+
+def bench_capture_threads(counts=ASSEMBLY_PART_COUNTS, thread_counts=CAPTURE_THREAD_COUNTS, meshes=ASSEMBLY_MESHES):
+    """Time capturing count assembly parts of meshes Meshes each, with their bounds computed by each number 
+    of worker threads, 0 for the calling thread. Scaling needs cores, and USD releasing the GIL while bounding.
+    Returns {count: {thread_count: seconds}}.
+    """
+
+    time_code = Usd.TimeCode.Default()
+
+    results = {}
+
+    for count in counts:
+        res = results[count] = {}
+        found = {}
+
+        stage, paths = make_assembly_parts_stage(count, meshes, 0.)
+        prims = [stage.GetPrimAtPath(path) for path in paths]
+
+        for thread_count in thread_counts + thread_counts[::-1]:
+            gc.collect()
+            start = time.perf_counter()
+            ini_wtrans, ldeltas, _, _, _, _, wbounds, _ = capture_prims(prims, stage, time_code, WorldToParentCache(),
+                                                                         thread_count=thread_count)
+            secs = time.perf_counter() - start
+            res[thread_count] = min(res.get(thread_count, secs), secs)
+
+            found[thread_count] = [np.array(values, dtype=float) for values in (ini_wtrans, ldeltas, wbounds)]
+            del ini_wtrans, ldeltas, wbounds, _
+
+        base_count = thread_counts[0]
+        same = all(np.allclose(a, b) for found_values in found.values() 
+                   for a, b in zip(found[base_count], found_values))
+
+        base = res[base_count]
+        print(f"{count} parts of {meshes} meshes, {os.cpu_count()} cores, same centroids and bounds: {same}")
+        for thread_count, secs in res.items():
+            speedup = "" if thread_count == base_count else f"  x{base / max(secs, 1e-9):.1f}"
+            print(f"  {thread_count:>2} threads{secs * 1000.:21.1f} ms{speedup}")
+
+    return results
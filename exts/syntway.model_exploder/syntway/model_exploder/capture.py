@@ -0,0 +1,238 @@
+"""
+Capturing parts in a single pass: each part's bound is computed once, untransformed, and its local and world
+centroids derived from it through one shared XformCache. Xform ops are read once, by the part's WritePlan.
+Centroids and bounds go straight into numpy rows: holding a few Gf objects per part would trigger more full
+garbage collections, which are most of the capture time in a large process.
+In fast bounds mode, authored extents are read instead and transformed in bulk with numpy.
+Bounds can be computed by worker threads, each over its own disjoint subtrees with its own BBoxCache: stage reads
+are safe concurrently, as nothing writes during capture. How much they overlap depends on USD releasing the GIL.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+
+import numpy as np
+
+from pxr import Gf, UsdGeom, Vt
+
+from .writer import WritePlan
+from .snapshot import XformSnapshot
+
+
+
+# bound sources counted by capture_prims()
+BOUNDS_EXTENT = "extent"
+BOUNDS_BBOX_CACHE = "bbox_cache"
+
+# corner selectors of a (2, 3) min-max box
+_BOX_CORNERS = np.array(list(itertools.product((0, 1), repeat=3)))
+
+
+
+def authored_extent(prim, time_code):
+    """Untransformed [min, max] Vt.Vec3fArray bound from prim's authored default purpose extentsHint,
+    or extent if it has no imageable children, which extent doesn't include. None if neither or empty,
+    or if prim is invisible or not of default purpose: UsdGeom.BBoxCache bounds those as empty."""
+
+    value = None
+
+    attr = prim.GetAttribute(UsdGeom.Tokens.extentsHint)
+    if attr and attr.HasAuthoredValue():
+        value = attr.Get(time_code)
+
+    if value is None:
+        attr = prim.GetAttribute(UsdGeom.Tokens.extent)
+        if attr and attr.HasAuthoredValue():  # not a schema fallback, as Cube's
+            if not any(c.IsA(UsdGeom.Imageable) for c in prim.GetChildren()):
+                value = attr.Get(time_code)
+
+    if value is None or len(value) < 2:
+        return None
+
+    lo, hi = value[0], value[1]
+    if lo[0] > hi[0] or lo[1] > hi[1] or lo[2] > hi[2]:
+        return None
+
+    imageable = UsdGeom.Imageable(prim)
+    if imageable.ComputeVisibility(time_code) == UsdGeom.Tokens.invisible or \
+       imageable.ComputePurpose() != UsdGeom.Tokens.default_:
+        return None
+
+    return value[:2]
+
+
+
+def authored_bound(prim, time_code):
+    """authored_extent() as a Gf.BBox3d, as UsdGeom.BBoxCache.ComputeUntransformedBound() returns, or None"""
+
+    ext = authored_extent(prim, time_code)
+    if ext is None:
+        return None
+
+    return Gf.BBox3d(Gf.Range3d(Gf.Vec3d(ext[0]), Gf.Vec3d(ext[1])))
+
+
+
+def _transform_points(points, mats):
+    """points: (N, K, 3), mats: (N, 4, 4) affine in USD's row vector convention. Returns (N, K, 3)."""
+
+    return np.einsum("nki,nij->nkj", points, mats[:, :3, :3]) + mats[:, np.newaxis, 3, :3]
+
+
+
+def _subtree_chunks(prims, chunk_count):
+    """Splits prims into up to chunk_count lists of (index, prim), grouping each prim with the others below it,
+    so that no subtree is bounded by two chunks. Largest groups are dealt first, each to the smallest chunk."""
+
+    groups = []
+    root = None
+    for index, prim in sorted(enumerate(prims), key=lambda item: item[1].GetPath()):  # descendants after parents
+        path = prim.GetPath()
+        if root is None or not path.HasPrefix(root):
+            root = path
+            groups.append([])
+        groups[-1].append((index, prim))
+
+    chunks = [[] for _ in range(min(chunk_count, len(groups)))]
+    for group in sorted(groups, key=len, reverse=True):
+        min(chunks, key=len).extend(group)
+
+    return chunks
+
+
+
+def _compute_bounds(chunk, time_code):
+    """Worker: [(index, Gf.BBox3d untransformed bound)] for chunk, with its own BBoxCache"""
+
+    bbox_cache = UsdGeom.BBoxCache(time_code, [UsdGeom.Tokens.default_])
+    return [(index, bbox_cache.ComputeUntransformedBound(prim)) for index, prim in chunk]
+
+
+
+def untransformed_bounds(prims, time_code, thread_count=0):
+    """Gf.BBox3d for each of prims, as UsdGeom.BBoxCache.ComputeUntransformedBound().
+    thread_count: workers, each over disjoint subtrees. 0: on the calling thread"""
+
+    if thread_count <= 0 or len(prims) < 2:
+        return [bound for _, bound in _compute_bounds(enumerate(prims), time_code)]
+
+    bounds = [None] * len(prims)
+
+    with ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix="ModelExploderCapture") as executor:
+        futures = [executor.submit(_compute_bounds, chunk, time_code) 
+                   for chunk in _subtree_chunks(prims, thread_count)]
+        for future in futures:
+            for index, bound in future.result():
+                bounds[index] = bound
+
+    return bounds
+
+
+
+def _set_bound_rows(row, wbb, prim, ltrans, xform_cache, ini_wtrans, ldeltas, wbounds):
+    """Fill row of the capture_prims() columns from prim's untransformed bound wbb, which is transformed to world"""
+
+    lmat, _ = xform_cache.GetLocalTransformation(prim)
+    lcent = lmat.Transform(wbb.ComputeCentroid())  # of the local bound
+    ldeltas[row] = ltrans - lcent  # translation from centroid to the placing pos
+
+    wbb.Transform(xform_cache.GetLocalToWorldTransform(prim))
+    wbb_aa = wbb.ComputeAlignedRange()
+
+    ini_wtrans[row] = wbb.ComputeCentroid()
+    wbounds[row, 0] = wbb_aa.GetMin()
+    wbounds[row, 1] = wbb_aa.GetMax()
+
+
+
+def capture_prims(prims, stage, time_code, w2p_cache, fast_bounds=False, counts=None, thread_count=0):
+    """Returns the per-part columns which PartTable.set_rows() and append_rows() take after prims.
+    w2p_cache: libs.usd_cache.WorldToParentCache
+    fast_bounds: bound parts by their authored extentsHint, or extent if nothing below is bounded,
+    with UsdGeom.BBoxCache only for the others.
+    counts: dict to receive the number of parts bounded by each source, as {BOUNDS_*: count}.
+    The last column returned tells the parts bounded by their authored extent.
+    thread_count: worker threads computing bounds. 0: on the calling thread"""
+
+    xform_cache = UsdGeom.XformCache(time_code)
+    bbox_cache = UsdGeom.BBoxCache(time_code, [UsdGeom.Tokens.default_]) if thread_count <= 0 else None
+
+    count = len(prims)
+
+    ini_wtrans = np.zeros((count, 3))
+    ldeltas = np.zeros((count, 3))
+    wbounds = np.zeros((count, 2, 3))
+
+    ini_ltrans = []
+    snapshots = []
+    w2ps = []
+    plans = []
+
+    bb_rows = []  # filled as they are bounded, if not by threads
+
+    ext_rows = []  # filled in bulk at the end
+    exts = []
+    ext_ltrans = []
+    ext_lmats = []
+    ext_wmats = []
+
+    for row, prim in enumerate(prims):
+
+        plan = WritePlan(prim, stage, time_code)
+        ltrans = plan.translation
+
+        snapshot = XformSnapshot(plan, stage)
+
+        w2p = w2p_cache.get(prim, time_code)
+
+        ini_ltrans.append(ltrans)
+        snapshots.append(snapshot)
+        w2ps.append(w2p)
+        plans.append(plan)
+
+        ext = authored_extent(prim, time_code) if fast_bounds else None
+        if ext is not None:
+            ext_rows.append(row)
+            exts.append(ext)
+            ext_ltrans.append(ltrans)
+            ext_lmats.append(xform_cache.GetLocalTransformation(prim)[0])
+            ext_wmats.append(xform_cache.GetLocalToWorldTransform(prim))
+        else:
+            bb_rows.append(row)
+
+            if bbox_cache is not None:
+                _set_bound_rows(row, bbox_cache.ComputeUntransformedBound(prim), prim, ltrans, xform_cache,
+                                ini_wtrans, ldeltas, wbounds)
+
+    if bbox_cache is None:
+        bb_prims = [prims[row] for row in bb_rows]
+
+        for row, prim, wbb in zip(bb_rows, bb_prims, untransformed_bounds(bb_prims, time_code, thread_count)):
+            _set_bound_rows(row, wbb, prim, ini_ltrans[row], xform_cache, ini_wtrans, ldeltas, wbounds)
+
+    if counts is not None:
+        counts[BOUNDS_EXTENT] = len(ext_rows)
+        counts[BOUNDS_BBOX_CACHE] = len(bb_rows)
+
+    extent_bounded = np.zeros(count, dtype=bool)
+    if not ext_rows:
+        return ini_wtrans, ldeltas, ini_ltrans, snapshots, w2ps, plans, wbounds, extent_bounded
+
+    extent_bounded[ext_rows] = True
+
+    # Vt arrays convert to numpy as buffers, not per element
+    exts = np.array(exts, dtype=np.float64)  # (N, 2, 3)
+    ltrans = np.array(Vt.Vec3dArray(ext_ltrans))
+    lmats = np.array(Vt.Matrix4dArray(ext_lmats))
+    wmats = np.array(Vt.Matrix4dArray(ext_wmats))
+
+    # as Gf.BBox3d: the centroid is the transformed box center, the aligned range bounds its corners
+    center = exts.mean(axis=1)[:, np.newaxis]
+    corners = _transform_points(exts[:, _BOX_CORNERS, [0, 1, 2]], wmats)
+
+    ini_wtrans[ext_rows] = _transform_points(center, wmats)[:, 0]
+    ldeltas[ext_rows] = ltrans - _transform_points(center, lmats)[:, 0]
+    wbounds[ext_rows, 0] = corners.min(axis=1)
+    wbounds[ext_rows, 1] = corners.max(axis=1)
+
+    return ini_wtrans, ldeltas, ini_ltrans, snapshots, w2ps, plans, wbounds, extent_bounded
@@ -0,0 +1,103 @@
+"""
+Explode math off the main thread: worker threads compute the parts' affine terms from immutable snapshots
+of the part table and post them to a queue, which the main thread drains on update before writing.
+Workers never touch USD: every stage read and write stays on the main thread, see create_edit_context().
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import queue
+
+import carb
+
+from . import kernel
+
+
+# everything calc_affine() needs, with read-only arrays
+AffineInputs = namedtuple("AffineInputs", "ini_wtrans ldelta w2p part_parent center center_mode order_accel")
+
+
+
+def calc_affine(inputs):
+    """Returns (dist_lens, dist_order, dest_base, dest_vec, dest_wvec) for all parts, 
+    see kernel.calc_affine_terms()"""
+
+    dist_lens = kernel.calc_dist_lens(inputs.ini_wtrans, inputs.center, inputs.center_mode)
+    dist_order = kernel.calc_dist_order(inputs.ini_wtrans, inputs.center, inputs.center_mode, dist_lens)
+
+    base, vec, wvec = kernel.calc_affine_terms(inputs.ini_wtrans, inputs.ldelta, dist_order, inputs.w2p,
+                                               inputs.part_parent, inputs.center, inputs.center_mode,
+                                               inputs.order_accel)
+
+    return dist_lens, dist_order, base, vec, wvec
+
+
+
+class ComputePool():
+
+    def __init__(self, thread_count):
+        """thread_count 0: disabled, callers compute on their own thread"""
+
+        self._executor = None
+        if thread_count > 0:
+            self._executor = ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix="ModelExploder")
+
+        self._results = queue.SimpleQueue()  # (token, inputs, future), put by workers
+        self._pending = set()  # futures not done yet, to cancel at shutdown
+
+
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+
+
+    def submit(self, token, inputs):
+        """Compute calc_affine(inputs) on a worker. Its result is returned by drain(), along with token and inputs."""
+
+        future = self._executor.submit(calc_affine, inputs)
+        self._pending.add(future)
+        future.add_done_callback(lambda f: self._done(token, inputs, f))
+
+
+
+    def _done(self, token, inputs, future):
+        self._pending.discard(future)
+        self._results.put((token, inputs, future))
+
+
+
+    def drain(self):
+        """Main thread: returns the finished (token, inputs, result), result is None if the computation failed"""
+
+        done = []
+
+        while True:
+            try:
+                token, inputs, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if future.cancelled():
+                continue
+
+            exc = future.exception()
+            if exc is not None:
+                carb.log_error(f"Model Exploder: background compute failed: {exc}")
+                done.append((token, inputs, None))
+            else:
+                done.append((token, inputs, future.result()))
+
+        return done
+
+
+
+    def shutdown(self):
+        if self._executor is not None:
+            # as shutdown(cancel_futures=True), which Python 3.7 lacks
+            for future in list(self._pending):
+                future.cancel()
+
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -39,6 +39,11 @@ OPTIONS_UNSELECT_ON_USE_LABEL = "Unselect Parts on Use"
 OPTIONS_UNSELECT_ON_USE_SETTING = "unselectOnUse"
 OPTIONS_UNSELECT_ON_USE_DEFAULT = True
 
+OPTIONS_APPLY_MODE_LABEL = "Apply Mode"
+OPTIONS_APPLY_MODE_IMMEDIATE_TEXT = "Immediate, {0:.1f} ms"
+OPTIONS_APPLY_MODE_DEFERRED_TEXT = "Next frame, {0:.1f} ms"
+OPTIONS_APPLY_MODE_UNKNOWN_TEXT = "Next frame"
+
 
 
 TIMELINE_RESET_TEXT = "Timeline has changed: resetting exploded meshes..."
@@ -75,6 +80,42 @@ ACCEL_DEFAULT = 1.68
 ACCEL_SETTING = "orderAccel"
 
 DIST_EXP = 1.3
+
+WRITE_SDF_SETTING = "writeSdf"  # write translations directly into layer specs
+WRITE_SDF_DEFAULT = False
+
+WRITE_EPSILON_SETTING = "writeEpsilon"  # parts which moved less than this since last write are not written
+WRITE_EPSILON_DEFAULT = 1e-6
+
+APPLY_BUDGET_MS_SETTING = "applyBudgetMs"  # per frame, larger applies continue on next frames. 0: no limit
+APPLY_BUDGET_MS_DEFAULT = 12.
+APPLY_CHUNK_SIZE = 2000  # parts written between budget checks
+
+IMMEDIATE_APPLY_MS_SETTING = "immediateApplyMs"  # applies measured below this run right away, else on next update
+IMMEDIATE_APPLY_MS_DEFAULT = 8.
+
+RECALC_BUDGET_MS_SETTING = "recalcBudgetMs"  # per frame for parts changed by others, the rest on next frames
+RECALC_BUDGET_MS_DEFAULT = 4.
+
+COMPUTE_THREADS_SETTING = "computeThreads"  # worker threads for the explode math of large part counts. 0: none
+COMPUTE_THREADS_DEFAULT = 2
+COMPUTE_MIN_PARTS = 20000  # below this, computing on the main thread is quicker than waiting for an update
+
+FAST_BOUNDS_SETTING = "fastBounds"  # capture bounds from authored extents, computing them only where there are none
+FAST_BOUNDS_DEFAULT = False
+
+CAPTURE_THREADS_SETTING = "captureThreads"  # worker threads computing part bounds on capture. 0: none
+CAPTURE_THREADS_DEFAULT = 0  # see bench.bench_capture_threads(): workers only pay off with spare cores
+CAPTURE_MIN_PARTS = 5000  # below this, bounds are computed on the main thread
+
+PREVIEW_SETTING = "previewLayer"  # explode into a session sublayer until Apply
+PREVIEW_DEFAULT = False
+PREVIEW_LAYER_TAG = "model_exploder_preview"
+
+EXPLODE_OP_SETTING = "explodeOp"  # move parts with an added xformOp:translate:explode op
+EXPLODE_OP_DEFAULT = False
+EXPLODE_OP_BAKE_SETTING = "explodeOpBake"  # on Apply: True to bake into the parts' ops, False to keep the explode ops
+EXPLODE_OP_BAKE_DEFAULT = True
 BOUNDS_BASE_AABB_COLOR = cl("#808080ff")  # rgba order
 
 
@@ -101,5 +142,8 @@ from transparent to fully visible."""
 TOOLTIP_OPTIONS_UNSELECT = """When starting to use a group of selected parts,
 should they be unselected for simpler visuals?"""
 
+TOOLTIP_OPTIONS_APPLY_MODE = """How parts are moved when changing the above settings: right away when it's quick enough,
+otherwise on the next frames. Shows the measured time to move all parts."""
+
 TOOLTIP_CANCEL = "Cancel the tool and leave parts in their initial positions."
 TOOLTIP_APPLY = "Applies the current parts positions and adds an Undo-Redo state."
\ No newline at end of file
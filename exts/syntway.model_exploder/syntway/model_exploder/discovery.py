@@ -0,0 +1,102 @@
+"""
+Part discovery: which prims under the selected ones are parts, in a single pruning Usd.PrimRange walk.
+Prim type checks are memoized by type name, as IsA() depends only on it.
+"""
+
+from pxr import Usd, UsdGeom, UsdSkel
+
+
+AVOID_CHILDREN_PRIM_TYPES = ["Camera"]  # avoid recursion on these
+
+# type kinds, as a mask
+KIND_PART = 1  # is a part
+KIND_PRUNE = 2  # don't look for parts inside
+
+
+
+def find_parts(prims):
+    """Returns the parts at or below each of prims, parents first:
+    - Gprims, except below avoided types.
+    - PointInstancers and SkelRoots, but nothing inside.
+    - Prims with authored references: the parts inside, else the prim itself.
+    """
+
+    parts = []
+    kinds = {}  # type name: kind
+
+    for prim in prims:
+        _add_parts(parts, prim, kinds)
+
+    return parts
+
+
+
+def is_pruned(stage, path, top_path):
+    """If find_parts() from the prim at top_path doesn't look inside an ancestor of the prim at path, 
+    so never reaches it. path must be below top_path, Sdf.Path's."""
+
+    kinds = {}
+
+    path = path.GetParentPath()
+    while path.HasPrefix(top_path):
+        ancestor = stage.GetPrimAtPath(path)
+        if ancestor.IsValid() and not ancestor.HasAuthoredReferences() and _kind(ancestor, kinds) & KIND_PRUNE:
+            return True
+
+        path = path.GetParentPath()
+
+    return False
+
+
+
+def _kind(prim, kinds):
+    type_name = prim.GetTypeName()
+
+    kind = kinds.get(type_name)
+    if kind is None:
+        if prim.IsA(UsdGeom.PointInstancer) or prim.IsA(UsdSkel.Root):  # instance, SkelRoot
+            kind = KIND_PART | KIND_PRUNE
+        else:
+            kind = KIND_PART if prim.IsA(UsdGeom.Gprim) else 0
+            if type_name in AVOID_CHILDREN_PRIM_TYPES:
+                kind |= KIND_PRUNE
+
+        kinds[type_name] = kind
+
+    return kind
+
+
+
+def _add_parts(parts, root, kinds):
+
+    if not root.IsValid():  # might not exist anymore
+        return
+
+    refs = []  # (prim, len(parts) on entering it) of the referencing prims being visited
+
+    it = iter(Usd.PrimRange.PreAndPostVisit(root))
+    visited = False
+
+    for prim in it:
+        visited = True
+
+        if it.IsPostVisit():
+            if refs and refs[-1][0] == prim:
+                _, start = refs.pop()
+                if len(parts) == start:  # no parts inside: add itself
+                    parts.append(prim)
+            continue
+
+        if prim.HasAuthoredReferences():  # refs: check if any children, whatever its type
+            refs.append((prim, len(parts)))
+            continue
+
+        kind = _kind(prim, kinds)
+        if kind & KIND_PART:
+            parts.append(prim)
+        if kind & KIND_PRUNE:
+            it.PruneChildren()
+
+    if not visited:  # an inactive or unloaded root is not in its own range, nor are its children
+        if root.HasAuthoredReferences() or _kind(root, kinds) & KIND_PART:
+            parts.append(root)
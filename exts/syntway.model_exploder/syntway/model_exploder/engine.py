@@ -1,4 +1,6 @@
-import asyncio, copy
+import time
+
+import numpy as np
 
 import carb
 
@@ -9,9 +11,8 @@ from omni.ui import color as cl
 
 import omni.kit.commands
 import omni.usd
-import omni.timeline
 
-from pxr import Usd, UsdGeom, UsdSkel, Sdf, Tf
+from pxr import Usd, UsdGeom, Sdf, Tf
 import pxr.Gf as Gf
 
 import omni.kit.notification_manager as nm
@@ -19,6 +20,8 @@ import omni.kit.notification_manager as nm
 from omni.usd.commands import TransformPrimCommand, TransformPrimSRTCommand
 
 from .libs.usd_helper import UsdHelper
+from .libs.usd_cache import WorldToParentCache, UntransformedBoundCache
+from .libs.usd_preview import SessionPreviewLayer
 from .libs.usd_utils import (set_prim_translation, set_prim_translation_fast, 
                              set_prim_transform, get_prim_transform, 
                              get_prim_translation, create_edit_context)
@@ -27,11 +30,21 @@ from .libs.viewport_helper import ViewportHelper
 from .libs.app_helper import AppHelper
 from .libs.app_utils import get_setting_or, set_setting, call_after_update
 
+from .parts import PartTable
+from .writer import write_plans, write_plans_sdf, add_translate_ops
+from .snapshot import restore_snapshots
+from .explode_op import (add_explode_ops, write_explode_ops, remove_explode_ops, forget_explode_ops, 
+                         EXPLODE_OP_NAME)
+from .scheduler import ApplyScheduler
+from .compute import ComputePool, calc_affine
+from .state import make_params, evolve
+from .discovery import find_parts, is_pruned
+from .capture import capture_prims, authored_bound
+from .notices import SelfWrites, plan_paths, state_paths, OP_NAMES, EXPLODE_OP_NAMES
+from . import kernel
 from . import const
 
 
-APPLY_ASYNC = True
-
 
 class Engine():
 
@@ -39,38 +52,69 @@ class Engine():
 
         self.meshes_base_aabb = Gf.Range3d()
 
-        self._meshes = []
+        self._parts = PartTable()
         
-        self._dist = 0
-        self._center_mode = get_setting_or(const.SETTINGS_PATH + const.CENTER_MODE_SETTING, const.DEFAULT_CENTER_MODE)        
-        self._dist_mult = get_setting_or(const.SETTINGS_PATH + const.DIST_MULT_SETTING, const.DEFAULT_DIST_MULT)
-        self._order_accel = get_setting_or(const.SETTINGS_PATH + const.ACCEL_SETTING, const.ACCEL_DEFAULT)
+        # state.ExplodeParams, replaced on each change: deferred work keeps the version it started with
+        self._params = make_params(
+            get_setting_or(const.SETTINGS_PATH + const.CENTER_MODE_SETTING, const.DEFAULT_CENTER_MODE),
+            get_setting_or(const.SETTINGS_PATH + const.ACCEL_SETTING, const.ACCEL_DEFAULT),
+            get_setting_or(const.SETTINGS_PATH + const.DIST_MULT_SETTING, const.DEFAULT_DIST_MULT))
+        self._write_sdf = get_setting_or(const.SETTINGS_PATH + const.WRITE_SDF_SETTING, const.WRITE_SDF_DEFAULT)
+        self._write_epsilon = get_setting_or(const.SETTINGS_PATH + const.WRITE_EPSILON_SETTING, 
+                                             const.WRITE_EPSILON_DEFAULT)
+        self._skipped_writes = 0  # in last apply, for parts which didn't move
+        self._fast_bounds = get_setting_or(const.SETTINGS_PATH + const.FAST_BOUNDS_SETTING, const.FAST_BOUNDS_DEFAULT)
+        self._capture_threads = get_setting_or(const.SETTINGS_PATH + const.CAPTURE_THREADS_SETTING, 
+                                               const.CAPTURE_THREADS_DEFAULT)
+        self.capture_counts = {}  # parts of the last sel_capture() by bound source, as {capture.BOUNDS_*: count}
+        self._preview = get_setting_or(const.SETTINGS_PATH + const.PREVIEW_SETTING, const.PREVIEW_DEFAULT)
+        self._session_preview = False  # preview for this capture: off if the session layer overrides parts
+        self._explode_op = get_setting_or(const.SETTINGS_PATH + const.EXPLODE_OP_SETTING, const.EXPLODE_OP_DEFAULT)
+        self._explode_op_bake = get_setting_or(const.SETTINGS_PATH + const.EXPLODE_OP_BAKE_SETTING, 
+                                               const.EXPLODE_OP_BAKE_DEFAULT)
 
-        self._explo_center = Gf.Vec3d(0)
         self._last_explo_center = Gf.Vec3d(0)
-        self._apply_needed = False
-        self._apply_task = None
+        self._scheduler = ApplyScheduler(self._apply_requested)
+        self._apply_resume = 0  # row the next apply starts from, after one pre-empted before writing all
+        self._apply_budget = get_setting_or(const.SETTINGS_PATH + const.APPLY_BUDGET_MS_SETTING, 
+                                            const.APPLY_BUDGET_MS_DEFAULT) / 1000.
+        self._immediate_apply = get_setting_or(const.SETTINGS_PATH + const.IMMEDIATE_APPLY_MS_SETTING, 
+                                               const.IMMEDIATE_APPLY_MS_DEFAULT) / 1000.
+        self._compute_pool = ComputePool(get_setting_or(const.SETTINGS_PATH + const.COMPUTE_THREADS_SETTING, 
+                                                        const.COMPUTE_THREADS_DEFAULT))
+        self._affine_token = None  # (parts, affine key) of the pending background computation
+        self._affine_failed = None  # token of the last failed one, to compute here instead
         self._recalc_changed_needed = set()
-        self._ignore_next_objects_changed = 0  # 0=no, 1=only next, 2:all until reset
+        self._recalc_budget = get_setting_or(const.SETTINGS_PATH + const.RECALC_BUDGET_MS_SETTING, 
+                                             const.RECALC_BUDGET_MS_DEFAULT) / 1000.
+        self._resync_needed = set()
+        self._capture_paths = []  # Sdf.Path's of the prims captured by sel_capture(), parts are found below them
+        self._self_writes = SelfWrites()  # paths being written by us, to skip in notices
 
-        self._dist_base_size = 100
+        self._w2p_cache = WorldToParentCache()
+        self._bounds_cache = UntransformedBoundCache()  # of parts, across updates
+        self._preview_layer = SessionPreviewLayer(const.PREVIEW_LAYER_TAG)
 
         self.usd = UsdHelper()
 
         self._app = AppHelper()
         self._app.add_update_event_fn(self._on_update)
 
-        stream = omni.timeline.get_timeline_interface().get_timeline_event_stream()
-        self._timeline_sub = stream.create_subscription_to_pop(self._on_timeline_event)
-
 
 
     def destroy(self):
         self._apply_cancel()
 
-        self._timeline_sub = None
+        self._compute_pool.shutdown()
+        self._affine_token = None
+
+        self._detach_preview()
 
         self._recalc_changed_needed.clear()
+        self._resync_needed.clear()
+
+        self._w2p_cache.clear()
+        self._bounds_cache.clear()
         
         if self.usd:
             self.usd.remove_stage_objects_changed_fn(self._on_stage_objects_changed)
@@ -89,11 +133,17 @@ class Engine():
     def reset(self, set_to_initial):
         self._apply_cancel()
 
-        if set_to_initial and self.dist > 0:  # if dist is 0, nothing to do
-            self._apply(-2, self._explo_center, self._meshes)  # returns prims to initial's
+        if self._preview_layer.is_attached():  # drops all preview edits at once
+            self._detach_preview()
 
-        self._meshes.clear()
-        self._dist = 0
+        elif set_to_initial and self.needs_reset:
+            self._apply(-2, self._params, self._parts)  # returns prims to initial's
+
+        self._parts = PartTable()  # new table: any pending apply keeps its own
+        self._params = evolve(self._params, dist=0)
+
+        self._w2p_cache.clear()
+        self._bounds_cache.clear()
 
         self.usd.remove_stage_objects_changed_fn(self._on_stage_objects_changed)
 
@@ -101,106 +151,110 @@ class Engine():
 
     def _on_update(self, _):
 
-        if self._recalc_changed_needed:
-            self._recalc_changed(self._recalc_changed_needed)
-            self._recalc_changed_needed.clear()
+        if self._resync_needed:
+            self._resync(self._resync_needed)
+            self._resync_needed.clear()
 
-        if self._apply_needed:
+        if self._recalc_changed_needed:  # coalesced since last update
+            self._recalc_changed(self._recalc_changed_needed, self._recalc_budget)
 
-            if APPLY_ASYNC:
-                if not self._apply_task or self._apply_task.done():
-                    self._apply_needed = False
+        self._drain_computed()
 
-                    dist = self._dist
+        self._scheduler.run(self._apply_budget)
 
-                    explo_center = Gf.Vec3d(self._explo_center)
 
-                    meshes = copy.copy(self._meshes)
 
-                    self._apply_task = asyncio.ensure_future(self._async_apply(dist, explo_center, meshes))
-                # else still applying last
+    def _drain_computed(self):
+        """Results of the compute pool: stored if their inputs are still current, else dropped"""
 
-            else:
-                self._apply_needed = False
-                self._apply(-1, self._explo_center, self._meshes)  # returns prims to initial's
+        for token, inputs, result in self._compute_pool.drain():
+            parts, key = token
+            parts.return_affine_inputs(inputs)
+
+            if token != self._affine_token:  # superseded
+                continue
+
+            self._affine_token = None
+
+            if result is None:
+                self._affine_failed = token
+            elif parts is self._parts and key == self._affine_key(self._params, parts.w2p_time_code, parts):
+                parts.set_affine(key, *result)
 
 
 
 
     def _on_stage_objects_changed(self, notice):
 
-        if self._ignore_next_objects_changed:
-            if self._ignore_next_objects_changed == 1:
-                self._ignore_next_objects_changed = 0
+        if not len(self._parts):  # should never happen?
             return
 
-        if not self._meshes:  # should never happen?
+        # what our own writes changed: skipped, leaving any external edits in the same notice
+        info_paths = self._self_writes.external(notice.GetChangedInfoOnlyPaths(), self._is_part_or_ancestor)
+        resynced_paths = self._self_writes.external(notice.GetResyncedPaths(), self._is_part_or_ancestor)
+        if not info_paths and not resynced_paths:
             return
 
-        # set filters  out duplicate path property changes
-        changed_paths = set(Sdf.Path.GetAbsoluteRootOrPrimPath(i) for i in notice.GetChangedInfoOnlyPaths())
+        # dict filters out duplicate path property changes: {prim_path: if only xform ops changed}
+        changed_paths = {}
+        for path in info_paths:
+            prim_path = path.GetAbsoluteRootOrPrimPath()
+            xform = path.IsPropertyPath() and UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(path.name)
+            changed_paths[prim_path] = changed_paths.get(prim_path, True) and xform
 
         # print("_on_stage_objects_changed", changed_paths)
 
-        for n in changed_paths:
-            ch_path = n.GetPrimPath().pathString
+        invalid_paths = []
+
+        parts = self._parts
+
+        for prim_path, xform_only in changed_paths.items():
+            ch_path = prim_path.pathString
 
             # avoid camera changes
             if ch_path.startswith("/OmniverseKit_") or ch_path.endswith("/animationData"):
                 continue
 
-            for p in self._meshes:
-                path = p["path"]
+            invalid_paths.append(prim_path)
 
-                if path.startswith(ch_path):
-                    self._recalc_changed_needed.add(path)
+            self._mark_changed(prim_path, not xform_only)
 
+        # prims added, removed, deactivated or recomposed: properties added or removed need no resync here
+        for path in resynced_paths:
+            if path.IsPrimPath() or path.IsAbsoluteRootPath():
+                if not path.pathString.startswith("/OmniverseKit_"):
+                    self._resync_needed.add(path)
+                    invalid_paths.append(path)
 
+                    self._mark_changed(path, True)
 
-    def _on_timeline_event(self, e):
-        # print("engine:_on_timeline_event", e.type)
+        self._w2p_cache.invalidate(invalid_paths)
 
-        if self.has_meshes:
-            if e.type == int(omni.timeline.TimelineEventType.CURRENT_TIME_CHANGED):
-                self._ignore_next_objects_changed = 1
 
 
+    def _mark_changed(self, prim_path, bounds_changed):
+        """Parts at or below prim_path are to be recalculated. An xform change leaves their untransformed bounds 
+        unchanged, but any change below a part changes its bound."""
 
+        parts = self._parts
 
-    AVOID_CHILDREN_PRIM_TYPES = ["Camera"]  # avoid recursion on these
+        rows = parts.rows_under(prim_path)
+        for row in rows:
+            self._recalc_changed_needed.add(parts.paths[row])
 
-    @staticmethod
-    def _traverse_add_prim(list, prim):
-        """Recursively traverse the hierarchy"""
+        if bounds_changed and rows:
+            self._bounds_cache.invalidate([parts.paths[row] for row in rows])
 
-        if not prim.IsValid():  # might not exist anymore
-            return
+        row = parts.part_above(prim_path)
+        if row >= 0:
+            path = parts.paths[row]
+            self._recalc_changed_needed.add(path)
+            self._bounds_cache.invalidate([path])
 
-        prim_t = prim.GetTypeName()
 
-        if prim.HasAuthoredReferences():  # refs: check if any children
-            ref_list = []
-            children = prim.GetChildren()
-            for c in children:
-                Engine._traverse_add_prim(ref_list, c)
 
-            if ref_list:  # add children but not itself
-                list += ref_list
-            else:  # no children, add itself
-                list.append(prim)
-            return
-
-        if prim.IsA(UsdGeom.PointInstancer) or prim.IsA(UsdSkel.Root):  # instance, SkelRoot: add but don't recurse inside
-            list.append(prim)
-            return
-
-        if prim.IsA(UsdGeom.Gprim):
-            list.append(prim)
-
-        if not prim_t in Engine.AVOID_CHILDREN_PRIM_TYPES:
-            children = prim.GetChildren()
-            for c in children:
-                Engine._traverse_add_prim(list, c)
+    def _is_part_or_ancestor(self, path):
+        return len(self._parts.rows_under(path)) > 0
 
 
 
@@ -213,11 +267,7 @@ class Engine():
             prim = stage.GetPrimAtPath(path)
             prims.append(prim)
 
-        u_prims = []
-        for p in prims:
-            Engine._traverse_add_prim(u_prims, p)
-
-        return u_prims
+        return find_parts(prims)
 
 
 
@@ -230,8 +280,10 @@ class Engine():
         
         u_prims = self._sel_get_prim_paths_parent_first_order(paths)
 
-        self._meshes = []
-        self._dist = 0        
+        self._parts = PartTable()
+        self._params = evolve(self._params, dist=0)
+
+        self._scheduler.reset_stats()
 
         if len(u_prims) < 2:
             return False
@@ -239,101 +291,260 @@ class Engine():
 
         time_code = self.usd.timecode
 
-        xform_cache = UsdGeom.XformCache(time_code)
-        bbox_cache = UsdGeom.BBoxCache(time_code, [UsdGeom.Tokens.default_])
+        self._w2p_cache.clear()  # stage might have changed since last use
+
+        self._capture_paths = [Sdf.Path(str(p)) for p in paths]
 
-        self._explo_center = Gf.Vec3d(0)  # average of prim centroids
-        aa_bounds = Gf.Range3d()
+        self.capture_counts = {}
+        self._parts.set_rows(u_prims, *capture_prims(u_prims, self.usd.stage, time_code, self._w2p_cache,
+                                                     self._fast_bounds, self.capture_counts, 
+                                                     self._capture_thread_count(len(u_prims))))
+        if self._fast_bounds:
+            carb.log_info(f"Model Exploder: part bounds by source: {self.capture_counts}")
 
-        # world positions
-        for prim in u_prims:
+        self._update_session_bounds(self._parts, True)
 
-            path = prim.GetPath().pathString
+        self._parts.w2p_time_code = time_code
 
-            lbb = bbox_cache.ComputeLocalBound(prim)
-            lcent = lbb.ComputeCentroid()
-            ltrans = get_prim_translation(prim, time_code)
-            ldelta = ltrans - lcent  # translation from centroid to the placing pos
+        self._session_preview = self._preview
+        if self._preview and self._session_overrides(self._parts.plans):
+            carb.log_warn("Model Exploder: the session layer overrides the xforms of some parts, "
+                          "which the preview layer below it can't move: exploding without preview")
+            self._session_preview = False
 
-            wbb = bbox_cache.ComputeWorldBound(prim)
-            wbb_aa = wbb.ComputeAlignedRange()
-            aa_bounds.UnionWith(wbb_aa)
-            wtrans = wbb.ComputeCentroid()
+        self._update_affine(self._parts, self._params, time_code)
 
-            lmat = get_prim_transform(prim, False, xform_cache, time_code)
+        if self._explode_op:
+            self._add_explode_ops(self._parts)
+        else:
+            self._add_translate_ops(self._parts, time_code)
+
+
+        # print(time_code, self._params)
+
+        self.usd.add_stage_objects_changed_fn(self._on_stage_objects_changed)
+
+        # print("sel_capture end")
+        return True
 
-            # print(path, "local", lbb, lcent, ltrans, "world", wbb, wbb_aa, wtrans, lmat)
 
-            # prim, prim_path, untransformed/local mid, world_mid, initial_local_translation
-            entry = {"prim": prim, "path": path, "ini_wtrans": wtrans, "ldelta": ldelta, "ini_lmat": lmat}
-            self._meshes.append(entry)
-            # print(entry)
-            
-            self._explo_center += wtrans
 
 
+    def _capture_thread_count(self, count):
+        return self._capture_threads if count >= const.CAPTURE_MIN_PARTS else 0
+
+
+
+    def _update_session_bounds(self, parts, recenter):
+        """Centroid, base AA bounds and distance scale, from all parts.
+        recenter: also move the explode center to the centroid, else only if it's there now."""
+
+        if not len(parts):
+            return
+
+        recenter = recenter or self.is_centered()
 
         # centroid and base AA bounds
-        self._explo_center /= len(u_prims)
-        self._last_explo_center = self._explo_center
+        explo_center = Gf.Vec3d(*parts.ini_wtrans.mean(axis=0).tolist())
+        self._last_explo_center = explo_center
 
-        self.meshes_base_aabb = aa_bounds
+        lo, hi = parts.bounds()
+        self.meshes_base_aabb = Gf.Range3d(Gf.Vec3d(*lo.tolist()), Gf.Vec3d(*hi.tolist()))
 
-        # _dist_base_size size scale
-        size = aa_bounds.GetSize()
-        self._dist_base_size = max(size[0], size[1], size[2]) * 0.5
+        # dist_base_size size scale
+        size = self.meshes_base_aabb.GetSize()
+        changes = {"dist_base_size": max(size[0], size[1], size[2]) * 0.5}
+        if recenter:
+            changes["center"] = explo_center
 
+        self._params = evolve(self._params, **changes)
 
-        self._calc_dist_order()
 
 
-        # print(time_code, self._explo_center, self._dist_base_size)
+    def _resync(self, resynced_paths):
+        """Follow prims added, removed, deactivated or recomposed at or below resynced_paths, without a new 
+        sel_capture(): parts which are gone are dropped, new prims under the captured ones become parts, 
+        and the remaining parts below are recalculated."""
 
-        self._ignore_next_objects_changed = 0
-        self.usd.add_stage_objects_changed_fn(self._on_stage_objects_changed)
+        parts = self._parts
+        if not len(parts):
+            return
 
-        # print("sel_capture end")
-        return True
+        stage = self.usd.stage
+        time_code = self.usd.timecode
+
+        keep = np.ones(len(parts), dtype=bool)
+
+        for path in resynced_paths:
+            for row in parts.rows_under(path):
+                part_path = parts.paths[row]
+
+                prim = stage.GetPrimAtPath(part_path)
+                if not prim.IsValid() or not prim.IsActive():
+                    keep[row] = False
+                    continue
+
+                # prim handles expire on resync
+                parts.prims[row] = prim
+                parts.plans[row].prim = prim
+                self._recalc_changed_needed.add(part_path)
+
+        # traverse again where a captured prim was resynced, or inside one, unless sel_capture() wouldn't get there
+        roots = set()
+        for path in resynced_paths:
+            for capture_path in self._capture_paths:
+                if path.HasPrefix(capture_path):
+                    if path == capture_path or not is_pruned(stage, path, capture_path):
+                        roots.add(path)
+                elif capture_path.HasPrefix(path):
+                    roots.add(capture_path)
+
+        found = find_parts([stage.GetPrimAtPath(root) for root in sorted(roots)])  # parents first
+
+        new_prims = []
+        new_paths = set()
+        for prim in found:
+            path = prim.GetPath()
+            if parts.row_of(path) < 0 and path not in new_paths:
+                new_prims.append(prim)
+                new_paths.add(path)
+
+        if keep.all() and not new_prims:
+            return
+
+        self._apply_cancel()  # row indices change
+
+        if not keep.all():
+            self._reset_rows(parts, np.flatnonzero(~keep), time_code)
+            parts.select_rows(np.flatnonzero(keep))
+
+        if new_prims:
+            count = len(parts)
+            parts.append_rows(new_prims, *capture_prims(new_prims, stage, time_code, self._w2p_cache, 
+                                                        self._fast_bounds, 
+                                                        thread_count=self._capture_thread_count(len(new_prims))))
+
+            new_rows = list(range(count, len(parts)))
+            if self._session_preview and self._session_overrides(parts.plans[count:]):
+                carb.log_warn("Model Exploder: the session layer overrides the xforms of some new parts, "
+                              "which won't move in preview")
+            if parts.explode_ops:
+                self._add_explode_ops(parts, new_rows)
+            else:
+                self._add_translate_ops(parts, time_code)
+
+            self._refresh_w2p(parts, new_rows, time_code)  # might be below displaced parts
+
+        self._update_session_bounds(parts, False)
+
+        self.apply_asap()
+
+
+
+    def _reset_rows(self, parts, rows, time_code):
+        """Parts about to be dropped, back to their initial xforms if their prims are still there, as when 
+        deactivated: else once activated again they would be captured as displaced."""
+
+        plans = [parts.plans[row] for row in rows.tolist()]  # expired handles: looked up again when applying
+        explode_op = parts.explode_ops
+
+        if self._preview_layer.is_attached():  # overriding the real layers' initial values
+            values = parts.explode_base[rows] if explode_op else parts.ini_ltrans[rows]
+            changes = list(zip(plans, [tuple(v) for v in values.tolist()]))
+            state = (False, changes, time_code, self._write_sdf, explode_op)
+            Engine.apply_state(state, self.usd.stage, self, self._preview_layer.layer)
+
+        else:
+            if explode_op:
+                values = [tuple(v) for v in parts.explode_base[rows].tolist()]
+            else:
+                values = [parts.snapshots[row] for row in rows.tolist()]
+            state = (True, list(zip(plans, values)), time_code, self._write_sdf, explode_op)
+            Engine.apply_state(state, self.usd.stage, self)
 
 
 
+    def _recalc_changed(self, ch_paths, budget=0.):
+        """Parts changed by others: ch_paths is a set of their paths, from which they are removed when done.
+        budget: seconds, parts left are done on next updates. 0: no limit"""
 
-    def _recalc_changed(self, ch_paths):
+        start = time.perf_counter()
 
         time_code = self.usd.timecode
-        bbox_cache = UsdGeom.BBoxCache(time_code, [UsdGeom.Tokens.default_])
+        xform_cache = UsdGeom.XformCache(time_code)
+
+        params = self._params
+        dist = self._calc_dist(params.dist, params)
+        explo_center = Gf.Vec3d(*params.center)
+
+        parts = self._parts
+        stage = self.usd.stage
+
+        affine_current = parts.affine_key == self._affine_key(params, time_code, parts)
 
-        dist = self._dist
-        dist = self._calc_dist(dist)
+        rows = []
+        ini_wtrans = []
+        ldeltas = []
+        ini_ltrans = []
 
-        for p in self._meshes:
+        while ch_paths:
+            if budget and rows and time.perf_counter() - start >= budget:
+                break
 
-            path = p["path"]
-            if path in ch_paths:  # only if changed
+            path = ch_paths.pop()
 
-                prim = p["prim"]
+            row = parts.row_of(path)
+            if row >= 0:  # only if still a part
 
-                lbb = bbox_cache.ComputeLocalBound(prim)
+                prim = parts.prims[row]
+
+                plan = parts.plans[row]
+                plan.resolve(stage, time_code)  # op stack might have changed
+
+                # from the source capture chose, else the centroid would jump. Unless the extent is gone
+                bound = authored_bound(prim, time_code) if parts.extent_bounded[row] else None
+                if bound is None:
+                    # parts with parts below are moved by our writes without notices: not cached
+                    bound = self._bounds_cache.get(prim, time_code, len(parts.rows_under(path)) == 1)
+
+                lbb = UntransformedBoundCache.local_bound(bound, xform_cache, prim)
                 lcent = lbb.ComputeCentroid()
-                ltrans = get_prim_translation(prim, time_code)
+                ltrans = plan.translation
+
+                if plan.explode_attr is not None:  # local bound includes the current explode offset
+                    offset = plan.explode_attr.Get()
+                    if offset is not None:
+                        lcent -= Gf.Vec3d(offset) - PartTable.to_vec3d(parts.explode_base[row])
+
                 ldelta = ltrans - lcent
 
-                wbb = bbox_cache.ComputeWorldBound(prim)
+                wbb = UntransformedBoundCache.world_bound(bound, xform_cache, prim)
                 new_wtrans = wbb.ComputeCentroid()
 
                 # calc dir
-                w_dir = new_wtrans - self._explo_center
-                w_dir = self._calc_normalized_dir(w_dir)
+                w_dir = new_wtrans - explo_center
+                w_dir = self._calc_normalized_dir(w_dir, params)
                 
                 new_ini_wtrans = new_wtrans - w_dir * dist
 
-                p["ini_wtrans"] = new_ini_wtrans
-                p["ldelta"] = ldelta
+                rows.append(row)
+                ini_wtrans.append(new_ini_wtrans)
+                ldeltas.append(ldelta)
+                ini_ltrans.append(ltrans)
                 # print("changed", path, new_wtrans, ldelta)
 
+        if not rows:
+            return
+
+        parts.update_rows(rows, ini_wtrans, ldeltas, ini_ltrans)
+        parts.forget_written(rows)  # moved by someone else
+        self._refresh_w2p(parts, rows, time_code)  # parents might have moved
+
+        if affine_current:  # only the changed rows' terms, instead of all parts on next apply
+            self._update_affine_rows(parts, params, time_code, rows)
+
         # not needed and conflicts with translate manipulator's dragging: self.apply_asap()
 
-        self._calc_dist_order()
 
 
 
@@ -342,116 +553,155 @@ class Engine():
 
 
 
+    def apply_asap(self, inputs=ApplyScheduler.INPUT_ALL):
+        """Apply now if measured quick enough, else on next update with the values current then.
+        inputs: ApplyScheduler.INPUT_* mask"""
+
+        self._scheduler.request(inputs)
 
-    def apply_asap(self):
-        self._apply_needed = True
+        if self.is_apply_immediate:
+            self._scheduler.run(self._apply_budget)
+
+
+    @property
+    def is_apply_immediate(self):
+        """Chosen from the measured cost of previous applies"""
+        scheduler = self._scheduler
+        return scheduler.apply_count > 0 and scheduler.avg_cost <= self._immediate_apply
 
 
     def _apply_cancel(self):
-        if APPLY_ASYNC:
-            if self._apply_task:
-                if self._apply_task.done():
-                    return
-                self._apply_task.cancel()
+        self._scheduler.cancel()
+
+
+    def _apply_requested(self):
+        chunk_size = const.APPLY_CHUNK_SIZE if self._apply_budget else 0
+        return self._apply_chunks(-1, self._params, self._parts, chunk_size, True)
+
 
 
-    async def _async_apply(self, dist_value, explo_center, meshes):
-        self._apply(dist_value, explo_center, meshes)
-        self._apply_task = None
 
+    def _apply(self, dist, params, parts):
+        """dist: -2: reset to stored initial pos, -1: use params.dist, >=0: 0..1
+        params: state.ExplodeParams"""
 
+        for _ in self._apply_chunks(dist, params, parts, 0):
+            pass
 
 
-    def _apply(self, dist, explo_center, meshes):
-        """dist: -2: reset to stored initial pos, -1: use current self._dist, >=0: 0..1"""
 
-        if not meshes:
+    def _apply_chunks(self, dist, params, parts, chunk_size, background=False):
+        """As _apply(), but a generator writing chunk_size parts at a time, each chunk in its own change blocks,
+        and yielding between chunks. chunk_size 0: all at once. 
+        Closing it between chunks leaves the remaining parts unwritten: the next apply writes them first.
+        It keeps writing for params and parts as they were when it started: newer versions make a new apply.
+        background: large part counts have their affine terms computed by the compute pool, 
+        yielding ApplyScheduler.WAIT until drained."""
+
+        if not len(parts):
             return
 
         # print("_apply", dist)
 
         time_code = self.usd.timecode
-
-        changes = self._prepare_apply_state(dist, explo_center, meshes, time_code, True)
+        stage = self.usd.stage
 
         is_reset = dist == -2
-        state = (is_reset, changes, time_code)
-        
-        Engine.apply_state(state, self.usd.stage, self)
+        explode_op = parts.explode_ops
 
-        # print("_apply end")
+        if is_reset:
+            changes = self._prepare_apply_state(dist, params, parts, time_code, explode_op)
+            state = (is_reset, changes, time_code, self._write_sdf, explode_op)
 
+            Engine.apply_state(state, stage, self)
 
+            parts.record_reset()
+            return
 
+        if background:
+            while self._request_affine(parts, params, time_code):
+                yield ApplyScheduler.WAIT
 
+        preview_layer = self._attach_preview() if self._session_preview else None
 
-    def _prepare_apply_state(self, dist, explo_center, meshes, time_code, with_prims):
-        """dist: -2: reset to stored initial pos, -1: use current self._dist, >=0: 0..1"""
+        values = self._calc_apply_values(dist, params, parts, time_code, explode_op)
+        wdisps = parts.dest_wvec * self._calc_dist_factor(dist, params)
 
-        if dist == -1:
-            dist = self._dist
-        # dist can now be [0..1] or -2 for reset to initial
-        if dist >= 0:
-            dist_factor = self._calc_dist(dist)
-        else:
-            dist_factor = dist
+        rows = parts.changed_rows(values, self._write_epsilon, time_code)
+        self._skipped_writes = len(parts) - len(rows)
 
-        time_code = self.usd.timecode
+        # from where a pre-empted apply stopped: else dragging would keep rewriting the first chunks only
+        rows = np.roll(rows, -np.searchsorted(rows, self._apply_resume))
 
-        xform_cache = UsdGeom.XformCache(time_code)
+        step = chunk_size or max(len(rows), 1)
+        for start in range(0, len(rows), step):
+            if start:
+                self._apply_resume = rows[start]
+                yield
 
-        changes = []
+            chunk = rows[start:start + step]
 
-        for mp in meshes:
+            plans = parts.plans
+            changes = self._make_changes([plans[row] for row in chunk.tolist()], 
+                                         [tuple(v) for v in values[chunk].tolist()])
+            state = (is_reset, changes, time_code, self._write_sdf, explode_op)
 
-            prim = mp["prim"]            
-            if not prim.IsValid():  # avoid any invalidated prims, deleted for example
-                # print("skipping", prim)
-                continue
+            Engine.apply_state(state, stage, self, preview_layer)
 
-            path = mp["path"]
-            ini_wtrans = mp["ini_wtrans"]
-            ldelta = mp["ldelta"]
-            prim = mp["prim"]
-            dist_order = mp["dist_order"]
-            
-            if dist_factor >= 0:
-                # calc world pos
-                # calc dir
-                w_ini_vec = ini_wtrans - explo_center
-                w_ini_len = w_ini_vec.GetLength()
-                w_ini_len = max(w_ini_len, 1e-5)
+            parts.record_written(chunk, values[chunk], wdisps[chunk])
+
+        self._apply_resume = 0
 
-                w_dir = self._calc_normalized_dir(w_ini_vec)
+        # print("_apply end")
 
-                order_factor = 1.0 + dist_order * self._order_accel
-                w_vec = w_dir * dist_factor * order_factor
 
-                dest_w_trans = ini_wtrans + w_vec
 
-                # get local->parent->world transforms
-                p2w = xform_cache.GetParentToWorldTransform(prim)
+    def _calc_apply_values(self, dist, params, parts, time_code, explode_op):
+        """dist: -1: use params.dist, >=0: 0..1
+        explode_op: values for the explode ops instead of the parts' translations.
+        Returns (N,3) values to write"""
 
-                # transform back from world to local coords
-                w2p = p2w.GetInverse()
-                dest_ptrans = w2p.Transform(dest_w_trans)
+        dist_factor = self._calc_dist_factor(dist, params)
 
-                # calc delta in mesh local/untransformed space
-                dest_ltrans = dest_ptrans + ldelta
+        self._update_affine(parts, params, time_code)
 
-                # local trans, in parent space coords
-                ltrans = (dest_ltrans[0], dest_ltrans[1], dest_ltrans[2])
+        # local trans, in parent space coords: a single multiply-add per part
+        dest_ltrans = parts.dest_base + parts.dest_vec * dist_factor
+        if explode_op:
+            dest_ltrans += parts.explode_base - parts.ini_ltrans
 
-                #print(prim, dest_w_trans, ltrans)
+        return dest_ltrans
 
 
-            else:
-                ltrans = mp["ini_lmat"]
 
-            if with_prims:
-                changes.append((prim, path, ltrans))
-            else:
-                changes.append((None, path, ltrans))
+    def _prepare_apply_state(self, dist, params, parts, time_code, explode_op):
+        """dist: -2: reset to stored initial pos, -1: use params.dist, >=0: 0..1
+        explode_op: values for the explode ops instead of the parts' translations.
+        Returns a list of (WritePlan, value) changes for all parts, values are XformSnapshot's when resetting."""
+
+        if dist != -2:
+            values = self._calc_apply_values(dist, params, parts, time_code, explode_op)
+            values = [tuple(v) for v in values.tolist()]
+
+        elif explode_op:
+            values = [tuple(v) for v in parts.explode_base.tolist()]
+
+        else:
+            values = parts.snapshots
+
+        return self._make_changes(parts.plans, values)
+
+
+
+    @staticmethod
+    def _make_changes(plans, values):
+
+        changes = []
+        for plan, value in zip(plans, values):
+            if not plan.prim.IsValid():  # avoid any invalidated prims, deleted for example
+                continue
+
+            changes.append((plan, value))
 
         return changes
 
@@ -459,15 +709,37 @@ class Engine():
 
 
     @staticmethod
-    def apply_state(state, stage, instance):
+    def apply_state(state, stage, instance, preview_layer=None):
+        """preview_layer: if given, non-reset changes are written there."""
         # print("apply_state", state, instance)
 
-        is_reset, changes, time_code = state
-
         if instance:
-            instance._ignore_next_objects_changed = 2
+            with instance._self_writes.writing(state_paths(state)):
+                Engine._apply_state(state, stage, preview_layer)
+        else:
+            Engine._apply_state(state, stage, preview_layer)
+
+
+
+    @staticmethod
+    def _apply_state(state, stage, preview_layer):
+
+        is_reset, changes, time_code, write_sdf, explode_op = state
+
+        changes = Engine._revive_changes(changes, stage, time_code)
+
+        if explode_op:
+
+            if is_reset:
+                remove_explode_ops(changes, stage, preview_layer)
+            else:
+                missing = [plan for plan, _ in changes if plan.explode_attr is None]
+                if missing:  # redo
+                    add_explode_ops(missing, stage, preview_layer)
+
+                write_explode_ops(changes, stage, preview_layer)
 
-        if not is_reset:
+        elif not is_reset:
 
             """ Slower alternative:
             for ch in changes:
@@ -479,65 +751,184 @@ class Engine():
                                                 time_code=time_code)
                 cmd.do()
             """
-            
-            stage = stage
-            sdf_change_block = 2
-            with Sdf.ChangeBlock():
 
-                for ch in changes:
-                    prim, path, lmat = ch
-                    if prim is None:
-                        prim = stage.GetPrimAtPath(path)
-                    # print(prim, ltrans)
-
-                    with create_edit_context(path, stage):
-                        set_prim_translation(prim, lmat, sdf_change_block=sdf_change_block, time_code=time_code)
-                        #set_prim_translation_fast(prim, lmat, sdf_change_block=sdf_change_block, time_code=time_code)
+            if preview_layer is not None:  # an owned layer: always through Sdf
+                write_plans_sdf(changes, time_code, stage, preview_layer)
+            elif write_sdf:
+                write_plans_sdf(changes, time_code, stage)
+            else:
+                write_plans(changes, time_code, stage)
 
         else:
 
+            """ Slower alternative, which decomposes and can rewrite op order:
             for ch in changes:
-                prim, path, ltrans = ch
-                # print(path,ltrans, type(ltrans))
-
-                cmd = TransformPrimCommand(path=path,
-                                           new_transform_matrix=ltrans,
+                plan, lmat = ch
+                cmd = TransformPrimCommand(path=plan.path.pathString,
+                                           new_transform_matrix=lmat,
                                            time_code=time_code)
                 cmd.do()
+            """
 
-        if instance:
-            instance._ignore_next_objects_changed = 0
+            restore_snapshots(changes)
 
         # print("apply_state end")
 
 
 
+    @staticmethod
+    def _revive_changes(changes, stage, time_code):
+        """Undo and redo can run after a part's prim was removed and restored, as by undoing its deletion 
+        or reloading its layer: its plan's Usd handles then expired, and are looked up again.
+        Returns changes without the parts which have no prim anymore."""
+
+        revived = []
+
+        for change in changes:
+            plan = change[0]
+
+            if not plan.prim.IsValid():
+                prim = stage.GetPrimAtPath(plan.path)
+                if not prim.IsValid():
+                    continue
+
+                plan.prim = prim
+                plan.resolve(stage, time_code)
+                if plan.explode_attr is not None:
+                    plan.explode_attr = prim.GetAttribute(EXPLODE_OP_NAME)
+
+            revived.append(change)
+
+        return revived
+
+
+
+
+
+    def _attach_preview(self):
+        if not self._preview_layer.is_attached():
+            with self._self_writes.writing(()):  # an empty layer: only the root and prims change
+                self._preview_layer.attach(self.usd.stage)
+
+        return self._preview_layer.layer
+
+
+
+    def _session_overrides(self, plans):
+        """If the session layer has opinions on properties which exploding writes for plans: those would win
+        over the preview layer, a sublayer of it"""
+
+        session_layer = self.usd.stage.GetSessionLayer()
+
+        if self._explode_op:
+            paths = set()
+            for plan in plans:
+                paths.update(plan.path.AppendProperty(name) for name in EXPLODE_OP_NAMES)
+        else:
+            paths = plan_paths([plan for plan in plans if plan.attr_path is not None])
+            paths.update(plan_paths([plan for plan in plans if plan.attr_path is None], OP_NAMES))  # ops to add
+
+        return any(session_layer.GetPropertyAtPath(path) is not None for path in paths)
+
+
+
+    def _add_translate_ops(self, parts, time_code):
+        """Parts without a translate op get one now, in a single batch, so that applying never changes op orders"""
+
+        missing = [plan for plan in parts.plans if plan.attr is None]
+        if not missing:
+            return
+
+        layer = self._attach_preview() if self._session_preview else None
+
+        with self._self_writes.writing(plan_paths(missing, OP_NAMES)):
+            add_translate_ops(missing, time_code, self.usd.stage, layer)
+
+        parts.ops_added = True
+
+
+
+    def _add_explode_ops(self, parts, rows=None):
+        """In a single batch for all parts or the given rows, into the preview layer if in preview mode"""
+
+        plans = parts.plans if rows is None else [parts.plans[row] for row in rows]
+
+        layer = self._attach_preview() if self._session_preview else None
+
+        with self._self_writes.writing(plan_paths(plans, EXPLODE_OP_NAMES)):
+            bases = add_explode_ops(plans, self.usd.stage, layer)
+
+        bases = np.array(bases, dtype=np.float64).reshape(len(plans), 3)
+        if rows is None:
+            parts.explode_base = bases
+        else:
+            explode_base = np.array(parts.explode_base)
+            explode_base[rows] = bases
+            parts.explode_base = explode_base
+
+        parts.explode_ops = True
+
+
+
+    def _detach_preview(self):
+        if not self._preview_layer.is_attached():
+            return
+
+        # everything written into the layer goes
+        paths = plan_paths(self._parts.plans, OP_NAMES + EXPLODE_OP_NAMES)
+        with self._self_writes.writing(paths):
+            self._preview_layer.detach()
+
+
+
+    def _resolve_preview_plans(self, parts, time_code):
+        """Ops added while writing into the preview layer are gone with it"""
+
+        stage = self.usd.stage
+
+        forget_explode_ops(parts.plans)
+
+        for plan in parts.plans:
+            if plan.attr is not None and not plan.attr.IsDefined():
+                plan.resolve(stage, time_code)
+
+
 
 
     def commit(self):
+        self._apply_cancel()
 
         time_code = self.usd.timecode
 
+        keep_explode_ops = self._parts.explode_ops and not self._explode_op_bake
+
+        if self._preview_layer.is_attached():
+            # back to the initial values, then the final state is written into the real edit targets
+            self._detach_preview()
+            self._resolve_preview_plans(self._parts, time_code)
+
+        elif self._parts.explode_ops:  # taken out, then baked or added again with undo
+            self._apply(-2, self._params, self._parts)
+
+        self._parts.explode_ops = False
+
         dist = -2
-        changes = self._prepare_apply_state(dist, self._explo_center, self._meshes, time_code, False)
+        changes = self._prepare_apply_state(dist, self._params, self._parts, time_code, keep_explode_ops)
         is_reset = dist == -2
-        initial_state = (is_reset, changes, time_code)
+        initial_state = (is_reset, changes, time_code, self._write_sdf, keep_explode_ops)
 
         dist = -1
-        changes = self._prepare_apply_state(dist, self._explo_center, self._meshes, time_code, False)
+        changes = self._prepare_apply_state(dist, self._params, self._parts, time_code, keep_explode_ops)
         is_reset = dist == -2
-        final_state = (is_reset, changes, time_code)
+        final_state = (is_reset, changes, time_code, self._write_sdf, keep_explode_ops)
 
 
-        self._ignore_next_objects_changed = 2
-
         stage = self.usd.stage
-        omni.kit.commands.execute("ExplodeEngineApplyCommand", 
-                                  initial_state=initial_state, 
-                                  final_state=final_state, 
-                                  stage=stage)
-
-        self._ignore_next_objects_changed = 0
+        with self._self_writes.writing(state_paths(final_state)):
+            omni.kit.commands.execute("ExplodeEngineApplyCommand", 
+                                      initial_state=initial_state, 
+                                      final_state=final_state, 
+                                      stage=stage)
 
         self.reset(False)
 
@@ -549,11 +940,11 @@ class Engine():
         self._ignore_next_objects_changed = 2
         
         xforms=[]
-        for mp in self._meshes:
-            p = mp["prim"]
-            path = mp["path"]
+        for row in range(len(self._parts)):
+            p = self._parts.prims[row]
+            path = self._parts.paths[row].pathString
 
-            ini_mat = mp["ini_lmat"]
+            ini_mat = self._parts.ini_lmats[row]
             new_mat = get_prim_transform(p, False, xform_cache, time_code)
 
             xforms.append((path, new_mat, ini_mat, time_code, False))
@@ -586,23 +977,41 @@ class Engine():
 
 
 
-    def _calc_dist(self, dist):
+    @staticmethod
+    def _calc_dist(dist, params):
         dist = dist ** const.DIST_EXP
-        dist = dist * self._dist_base_size * self._dist_mult
+        dist = dist * params.dist_base_size * params.dist_mult
         return dist
 
 
-    def _calc_dir(self, dir):
-        if self._center_mode >= 1 and self._center_mode <= 3:  # around axis: zero axis displacement
-            dir[self._center_mode - 1] = 0.
-        elif self._center_mode >= 4:  # from a plane
-            i = self._center_mode - 4
+    @staticmethod
+    def _calc_dist_factor(dist, params):
+        """dist: -2: reset to stored initial pos, -1: use params.dist, >=0: 0..1
+        Returns -2 for reset or the dist_factor"""
+
+        if dist == -1:
+            dist = params.dist
+        # dist can now be [0..1] or -2 for reset to initial
+        if dist >= 0:
+            return Engine._calc_dist(dist, params)
+        else:
+            return dist
+
+
+    @staticmethod
+    def _calc_dir(dir, params):
+        center_mode = params.center_mode
+        if center_mode >= 1 and center_mode <= 3:  # around axis: zero axis displacement
+            dir[center_mode - 1] = 0.
+        elif center_mode >= 4:  # from a plane
+            i = center_mode - 4
             dir[i] = 0.
             dir[(i + 1) % 3] = 0.
 
 
-    def _calc_normalized_dir(self, dir):
-        self._calc_dir(dir)
+    @staticmethod
+    def _calc_normalized_dir(dir, params):
+        Engine._calc_dir(dir, params)
 
         if dir.GetLength() > 1e-6:
             dir.Normalize()
@@ -610,31 +1019,99 @@ class Engine():
         return dir
 
 
-    def _calc_dist_order(self):
-        """dist_order is the 0..1 position of the mesh with regard to _explo_center"""
+    @staticmethod
+    def _affine_key(params, time_code, parts):
+        """Versions the affine terms are computed from: comparing them detects stale terms"""
+        return (params.affine_version, time_code, parts.revision)
+
 
-        min_len = float("inf")
-        max_len = -1
 
-        len_list = []
-        for mp in self._meshes:
-            vec = mp["ini_wtrans"] - self._explo_center
-            self._calc_dir(vec)
+    def _update_affine(self, parts, params, time_code):
+        """Precompute parts' dest_base and dest_vec, if center, center mode, acceleration, time or parts have changed"""
 
-            len = vec.GetLength()
-            len = max(len, 1e-5)
-            len_list.append(len)
+        self._refresh_w2p_time(parts, time_code)
+
+        key = self._affine_key(params, time_code, parts)
+        if parts.affine_key == key:
+            return
 
-            min_len = min(len, min_len)
-            max_len = max(len, max_len)
+        parts.set_affine(key, *calc_affine(parts.affine_inputs(params)))
 
-        max_min_range = max_len - min_len
-        max_min_range = max(max_min_range, 1e-5)
-        index = 0
-        for mp in self._meshes:
-            order = (len_list[index] - min_len) / max_min_range
-            mp["dist_order"] = order
-            index+=1
+
+
+    def _update_affine_rows(self, parts, params, time_code, rows):
+        """After the inputs of rows changed, from affine terms which were current before"""
+
+        rows = np.array(rows, dtype=np.int64)
+
+        res = kernel.calc_affine_rows(rows, parts.ini_wtrans, parts.ldelta, parts.w2p, parts.part_parent,
+                                      params.center, params.center_mode, params.order_accel,
+                                      parts.dist_lens, parts.dist_order, parts.dest_wvec)
+        if res is not None:  # else the distance range changed: all parts' terms are computed on next apply
+            parts.update_affine_rows(self._affine_key(params, time_code, parts), *res)
+
+
+
+    def _request_affine(self, parts, params, time_code):
+        """Have the compute pool update parts' affine terms, if stale. 
+        Returns True while waiting for them, False when current or when they should be computed here."""
+
+        self._refresh_w2p_time(parts, time_code)  # USD reads stay here
+
+        key = self._affine_key(params, time_code, parts)
+        if parts.affine_key == key:
+            return False
+
+        if not self._compute_pool.enabled or len(parts) < const.COMPUTE_MIN_PARTS:
+            return False
+
+        token = (parts, key)
+        if token == self._affine_failed:
+            return False
+
+        if token != self._affine_token:  # any previous one is dropped when drained
+            self._compute_pool.submit(token, parts.lend_affine_inputs(params))  # no copies
+            self._affine_token = token
+
+        return True
+
+
+
+    def _refresh_w2p_time(self, parts, time_code):
+        if parts.w2p_time_code != time_code:  # parents might be time sampled
+            self._refresh_w2p(parts, range(len(parts)), time_code)
+            parts.w2p_time_code = time_code
+
+
+
+    def _refresh_w2p(self, parts, rows, time_code):
+        """Set parts' world->parent matrices at rest, as if no part was displaced"""
+
+        xform_cache = None
+
+        valid_rows = []
+        w2ps = np.empty((len(rows), 4, 4))
+
+        for row in rows:
+            prim = parts.prims[row]
+            if not prim.IsValid():
+                continue
+
+            anc = parts.part_parent[row]
+            if anc < 0:  # no part above: our writes never move its parent
+                w2p = self._w2p_cache.get(prim, time_code)
+
+            else:  # parent is carried by an exploded ancestor part: uncacheable, undo the ancestor's displacement
+                if xform_cache is None:
+                    xform_cache = UsdGeom.XformCache(time_code)
+
+                w2p = np.array(xform_cache.GetParentToWorldTransform(prim).GetInverse())
+                w2p[3] += parts.written_wdisp(anc) @ w2p[:3]
+
+            w2ps[len(valid_rows)] = w2p
+            valid_rows.append(row)
+
+        parts.update_w2p(valid_rows, w2ps[:len(valid_rows)])
 
 
 
@@ -646,9 +1123,28 @@ class Engine():
     def has_meshes(self):
         return self.meshes_count >= 2
 
+    @property
+    def scheduler(self):
+        """For apply stats: coalesced_count, apply_count, last_latency"""
+        return self._scheduler
+
+    @property
+    def skipped_writes(self):
+        """Parts not written in the last apply because they didn't move"""
+        return self._skipped_writes
+
+    @property
+    def has_explode_ops(self):
+        return self._parts.explode_ops
+
+    @property
+    def needs_reset(self):
+        """If parts are displaced or have ops added since capture: reset(True) has something to restore"""
+        return self.dist > 0 or self._parts.explode_ops or self._parts.ops_added
+
     @property
     def meshes_count(self):
-        return len(self._meshes)
+        return len(self._parts)
 
     @property
     def stage_selection_meshes_count(self):
@@ -657,65 +1153,68 @@ class Engine():
         return len(u_prims)
 
 
+    @property
+    def params(self):
+        """Current state.ExplodeParams"""
+        return self._params
+
     @property
     def center(self):
-        return self._explo_center
+        return Gf.Vec3d(*self._params.center)
 
     @center.setter
     def center(self, center):
-        self._explo_center = center
-        self._calc_dist_order()
-        self.apply_asap()
+        self._params = evolve(self._params, center=center)
+        self.apply_asap(ApplyScheduler.INPUT_CENTER)
 
     @property    
     def dist(self):
-        return self._dist
+        return self._params.dist
 
     @dist.setter
     def dist(self, d):
-        self._dist = d
-        self.apply_asap()
+        self._params = evolve(self._params, dist=d)
+        self.apply_asap(ApplyScheduler.INPUT_DIST)
 
 
 
     @property
     def center_mode(self):
-        return self._center_mode
+        return self._params.center_mode
 
     @center_mode.setter
     def center_mode(self, c):
-        self._center_mode = c
-        set_setting(const.SETTINGS_PATH + const.CENTER_MODE_SETTING, self._center_mode)
-        self.apply_asap()
+        self._params = evolve(self._params, center_mode=c)
+        set_setting(const.SETTINGS_PATH + const.CENTER_MODE_SETTING, c)
+        self.apply_asap(ApplyScheduler.INPUT_OPTIONS)
 
     @property
     def order_accel(self):
-        return self._order_accel
+        return self._params.order_accel
 
     @order_accel.setter
     def order_accel(self, v):
-        self._order_accel = v
-        set_setting(const.SETTINGS_PATH + const.ACCEL_SETTING, self._order_accel)
-        self.apply_asap()
+        self._params = evolve(self._params, order_accel=v)
+        set_setting(const.SETTINGS_PATH + const.ACCEL_SETTING, v)
+        self.apply_asap(ApplyScheduler.INPUT_OPTIONS)
 
     @property
     def dist_mult(self):
-        return self._dist_mult
+        return self._params.dist_mult
 
     @dist_mult.setter
     def dist_mult(self, m):
-        self._dist_mult = m
-        set_setting(const.SETTINGS_PATH + const.DIST_MULT_SETTING, self._dist_mult)
-        self.apply_asap()
+        self._params = evolve(self._params, dist_mult=m)
+        set_setting(const.SETTINGS_PATH + const.DIST_MULT_SETTING, m)
+        self.apply_asap(ApplyScheduler.INPUT_OPTIONS)
 
 
 
     def recenter(self):
-        self._explo_center = self._last_explo_center
-        self.apply_asap()
+        self.center = self._last_explo_center
 
     def is_centered(self):
-        return Gf.IsClose(self._explo_center, self._last_explo_center, 1e-6)
+        return Gf.IsClose(self.center, self._last_explo_center, 1e-6)
 
 
 
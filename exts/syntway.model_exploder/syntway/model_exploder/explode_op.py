@@ -0,0 +1,155 @@
+"""
+Additive explode translate op: a parent-space translate op in front of each part's op order,
+so that exploding writes a single Vec3d per part, whatever the rest of its xform stack.
+"""
+
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from .libs.usd_utils import XFORM_OP_ORDER_ATTR_NAME, XFORM_OP_RESET_STACK_TOKEN
+from .writer import group_by_layer
+
+
+EXPLODE_OP_NAME = "xformOp:translate:explode"
+
+
+
+def add_explode_ops(plans, stage, layer=None):
+    """Insert an explode op first in the op order of each plan's prim, in one change block per layer.
+    Prims which already have one keep it.
+    layer: if given, all ops are added there instead of in the plans' edit layers.
+    Returns the ops' current values, a Gf.Vec3d per plan.
+    """
+
+    bases = []
+    added = []
+
+    for plan in plans:
+        order = UsdGeom.Xformable(plan.prim).GetXformOpOrderAttr().Get()
+        order = list(order) if order else []
+
+        if EXPLODE_OP_NAME in order:  # left by a previous Apply
+            plan.explode_attr = plan.prim.GetAttribute(EXPLODE_OP_NAME)
+            plan.explode_added = False
+            value = plan.explode_attr.Get()
+            bases.append(Gf.Vec3d(value) if value is not None else Gf.Vec3d(0.))
+            continue
+
+        at = 1 if order and order[0] == XFORM_OP_RESET_STACK_TOKEN else 0
+        order.insert(at, EXPLODE_OP_NAME)
+
+        added.append((plan, order))
+        bases.append(Gf.Vec3d(0.))
+
+    for group_layer, group in group_by_layer(added, layer).items():
+        target = _get_edit_target(group_layer, stage)
+        target_layer = target.GetLayer()
+
+        with Sdf.ChangeBlock():
+            for plan, order in group:
+                prim_spec = Sdf.CreatePrimInLayer(target_layer, target.MapToSpecPath(plan.path))
+
+                order_spec = prim_spec.attributes.get(XFORM_OP_ORDER_ATTR_NAME)
+                if order_spec is None:
+                    plan.explode_prev_order = None
+                    order_spec = Sdf.AttributeSpec(prim_spec, XFORM_OP_ORDER_ATTR_NAME, Sdf.ValueTypeNames.TokenArray,
+                                                   Sdf.VariabilityUniform)
+                else:
+                    plan.explode_prev_order = order_spec.default
+
+                order_spec.default = order
+
+                op_spec = prim_spec.attributes.get(EXPLODE_OP_NAME)
+                if op_spec is None:
+                    op_spec = Sdf.AttributeSpec(prim_spec, EXPLODE_OP_NAME, Sdf.ValueTypeNames.Double3)
+                op_spec.default = Gf.Vec3d(0.)
+
+                plan.explode_spec = op_spec
+                plan.explode_spec_layer = target_layer
+                plan.explode_added = True
+
+    for plan, _ in added:
+        plan.explode_attr = plan.prim.GetAttribute(EXPLODE_OP_NAME)
+
+    return bases
+
+
+
+def write_explode_ops(changes, stage, layer=None):
+    """changes: list of (WritePlan, offset). Sets the explode op values through the Sdf API,
+    in one change block per layer.
+    """
+
+    for group_layer, group in group_by_layer(changes, layer).items():
+        target = _get_edit_target(group_layer, stage)
+        target_layer = target.GetLayer()
+
+        with Sdf.ChangeBlock():
+            for plan, offset in group:
+
+                spec = plan.explode_spec
+                if spec is None or spec.expired or plan.explode_spec_layer != target_layer:
+                    prim_spec = Sdf.CreatePrimInLayer(target_layer, target.MapToSpecPath(plan.path))
+                    spec = prim_spec.attributes.get(EXPLODE_OP_NAME)
+                    if spec is None:
+                        spec = Sdf.AttributeSpec(prim_spec, EXPLODE_OP_NAME, Sdf.ValueTypeNames.Double3)
+
+                    plan.explode_spec = spec
+                    plan.explode_spec_layer = target_layer
+
+                spec.default = Gf.Vec3d(*offset)
+
+
+
+def remove_explode_ops(changes, stage, layer=None):
+    """changes: list of (WritePlan, base). Takes out the ops added by add_explode_ops(), restoring each layer's
+    previous op order, in one change block per layer. Ops which were already there are set back to base.
+    """
+
+    for group_layer, group in group_by_layer(changes, layer).items():
+        target = _get_edit_target(group_layer, stage)
+        target_layer = target.GetLayer()
+
+        with Sdf.ChangeBlock():
+            for plan, base in group:
+                if plan.explode_attr is None:
+                    continue
+
+                prim_spec = target_layer.GetPrimAtPath(target.MapToSpecPath(plan.path))
+                if prim_spec is None:
+                    continue
+
+                op_spec = prim_spec.attributes.get(EXPLODE_OP_NAME)
+
+                if plan.explode_added:
+                    if op_spec is not None:
+                        prim_spec.RemoveProperty(op_spec)
+
+                    order_spec = prim_spec.attributes.get(XFORM_OP_ORDER_ATTR_NAME)
+                    if order_spec is not None:
+                        if plan.explode_prev_order is None:
+                            prim_spec.RemoveProperty(order_spec)
+                        else:
+                            order_spec.default = plan.explode_prev_order
+
+                    target_layer.ScheduleRemoveIfInert(prim_spec)  # an over created when adding
+
+                elif op_spec is not None:
+                    op_spec.default = Gf.Vec3d(*base)
+
+    forget_explode_ops([plan for plan, _ in changes])
+
+
+
+def forget_explode_ops(plans):
+    """After the ops are gone, for example with their layer"""
+
+    for plan in plans:
+        plan.explode_attr = None
+        plan.explode_added = False
+        plan.explode_spec = None
+        plan.explode_spec_layer = None
+
+
+
+def _get_edit_target(layer, stage):
+    return Usd.EditTarget(layer) if layer is not None else stage.GetEditTarget()
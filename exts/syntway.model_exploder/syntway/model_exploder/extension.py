@@ -102,7 +102,10 @@ class ExplodeEngineApplyCommand(omni.kit.commands.Command):
     """
     Undo/redoable command used by engine to apply final and initial position lists
     Don't use outside this extension.
-    States are a tuple of (dist, change_list, time_code)
+    initial_state, final_state: tuples of (is_reset, changes, time_code, write_sdf, explode_op), see Engine.apply_state().
+    changes: list of (WritePlan, value), value being the translation to write, or the explode op's offset
+    in explode op mode, or an XformSnapshot when is_reset and not in explode op mode.
+    stage: Usd.Stage to write into.
     """
 
     def __init__(self, initial_state, final_state, stage):
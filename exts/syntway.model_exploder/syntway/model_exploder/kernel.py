@@ -0,0 +1,168 @@
+"""
+Batched explode math over all parts of a PartTable, in single numpy passes.
+Center modes are the indices of const.CENTER_COMBO_LABELS: 0=point, 1..3=X/Y/Z axis, 4..6=XY/YZ/ZX plane.
+"""
+
+import numpy as np
+
+
+_DIR_MASKS = [
+    np.array([1., 1., 1.]),  # point
+    np.array([0., 1., 1.]),  # X axis: zero axis displacement
+    np.array([1., 0., 1.]),  # Y axis
+    np.array([1., 1., 0.]),  # Z axis
+    np.array([0., 0., 1.]),  # XY plane: only away from plane
+    np.array([1., 0., 0.]),  # YZ plane
+    np.array([0., 1., 0.]),  # ZX plane
+]
+
+
+def calc_dir_mask(center_mode):
+    return _DIR_MASKS[center_mode]
+
+
+
+def calc_dirs(ini_wtrans, center, center_mode):
+    """Center->part vectors with axis/plane components zeroed, as in Engine._calc_dir()"""
+    return (ini_wtrans - np.asarray(center, dtype=np.float64)) * calc_dir_mask(center_mode)
+
+
+
+def calc_normalized_dirs(ini_wtrans, center, center_mode):
+    """As Engine._calc_normalized_dir(): vectors shorter than 1e-6 are left unnormalized."""
+
+    dirs = calc_dirs(ini_wtrans, center, center_mode)
+
+    lens = np.linalg.norm(dirs, axis=1)
+    big = lens > 1e-6
+    dirs[big] /= lens[big, np.newaxis]
+
+    return dirs
+
+
+
+def calc_dist_lens(ini_wtrans, center, center_mode):
+    """Distance of each part from center, which calc_dist_order() normalizes"""
+
+    lens = np.linalg.norm(calc_dirs(ini_wtrans, center, center_mode), axis=1)
+    np.maximum(lens, 1e-5, out=lens)
+
+    return lens
+
+
+
+def calc_dist_order(ini_wtrans, center, center_mode, lens=None):
+    """0..1 position of each part with regard to center. lens: from calc_dist_lens(), if already known"""
+
+    if not len(ini_wtrans):
+        return np.zeros(0)
+
+    if lens is None:
+        lens = calc_dist_lens(ini_wtrans, center, center_mode)
+
+    min_len = lens.min()
+    max_min_range = max(lens.max() - min_len, 1e-5)
+
+    return (lens - min_len) / max_min_range
+
+
+
+def transform_points(mats, points):
+    """Row-vector transform of (N,3) points by (N,4,4) matrices, as Gf.Matrix4d.Transform()"""
+
+    h = np.einsum("ni,nij->nj", points, mats[:, :3, :]) + mats[:, 3, :]
+    return h[:, :3] / h[:, 3:]
+
+
+
+def calc_affine_terms(ini_wtrans, ldelta, dist_order, w2p, part_parent,
+                      center, center_mode, order_accel):
+    """Parent-space terms of the destination local translations, for all parts:
+        dest_ltrans = base + dist_factor * vec
+    For a fixed center, center mode and acceleration, so that each distance change is a single multiply-add.
+    w2p are the world->parent matrices at rest (undisplaced). Also returns w_vec, the world displacement per dist_factor.
+    """
+
+    w_vec = _calc_w_vec(ini_wtrans, dist_order, center, center_mode, order_accel)
+
+    nested = np.flatnonzero(part_parent >= 0)
+    base, vec = _calc_base_vec(ini_wtrans, ldelta, w2p, w_vec, nested, w_vec[part_parent[nested]])
+
+    return base, vec, w_vec
+
+
+
+def calc_affine_rows(rows, ini_wtrans, ldelta, w2p, part_parent, center, center_mode, order_accel,
+                     dist_lens, dist_order, w_vec):
+    """calc_dist_order() and calc_affine_terms() for changed rows only, from the previous results for all parts,
+    which are not modified. Parts nested in changed ones are updated too, as they discount their ancestor's w_vec.
+    Returns (affected rows, dist_lens, dist_order, base, vec, w_vec) with the new values of the affected rows only,
+    or None if the distance range changed: all distance orders then change, for a full calc_affine_terms().
+    """
+
+    rows = np.unique(rows)
+
+    old_min, old_max = dist_lens.min(), dist_lens.max()
+
+    row_lens = calc_dist_lens(ini_wtrans[rows], center, center_mode)
+    new_min, new_max = row_lens.min(), row_lens.max()
+    if new_min < old_min or new_max > old_max:
+        return None
+
+    old_row_lens = dist_lens[rows]
+    if ((old_row_lens == old_min) | (old_row_lens == old_max)).any():  # an extreme might have moved in
+        others = np.delete(dist_lens, rows)
+        if len(others):
+            new_min, new_max = min(new_min, others.min()), max(new_max, others.max())
+        if new_min != old_min or new_max != old_max:
+            return None
+
+    row_order = (row_lens - old_min) / max(old_max - old_min, 1e-5)
+    row_w_vec = _calc_w_vec(ini_wtrans[rows], row_order, center, center_mode, order_accel)
+
+    affected = np.union1d(rows, np.flatnonzero(np.isin(part_parent, rows)))
+    at = np.searchsorted(affected, rows)  # changed rows among affected
+
+    def affected_values(column, row_values):
+        values = column[affected]
+        values[at] = row_values
+        return values
+
+    # w_vec of the parts above nested affected ones, which might be among rows
+    parents = part_parent[affected]
+    nested = np.flatnonzero(parents >= 0)
+    parents = parents[nested]
+    parent_w_vec = w_vec[parents]
+    changed = np.isin(parents, rows)
+    parent_w_vec[changed] = row_w_vec[np.searchsorted(rows, parents[changed])]
+
+    dist_lens = affected_values(dist_lens, row_lens)
+    dist_order = affected_values(dist_order, row_order)
+    w_vec = affected_values(w_vec, row_w_vec)
+
+    base, vec = _calc_base_vec(ini_wtrans[affected], ldelta[affected], w2p[affected], w_vec, nested, parent_w_vec)
+
+    return affected, dist_lens, dist_order, base, vec, w_vec
+
+
+
+def _calc_w_vec(ini_wtrans, dist_order, center, center_mode, order_accel):
+    w_dir = calc_normalized_dirs(ini_wtrans, center, center_mode)
+
+    order_factor = 1.0 + dist_order * order_accel
+    return w_dir * order_factor[:, np.newaxis]
+
+
+
+def _calc_base_vec(ini_wtrans, ldelta, w2p, w_vec, nested, parent_w_vec):
+    """nested: rows with a part above, parent_w_vec: w_vec of the nearest part above each of them"""
+
+    # world back into parent coords, then delta in mesh local/untransformed space
+    base = transform_points(w2p, ini_wtrans) + ldelta
+    vec = np.einsum("ni,nij->nj", w_vec, w2p[:, :3, :3])  # directions: no translation
+
+    # a part inside another part is carried by its ancestor's displacement: discount it
+    if len(nested):
+        vec[nested] -= np.einsum("ni,nij->nj", parent_w_vec, w2p[nested, :3, :3])
+
+    return base, vec
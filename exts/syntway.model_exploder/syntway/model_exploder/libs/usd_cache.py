@@ -0,0 +1,175 @@
+"""
+Notes:
+"""
+
+from collections import OrderedDict
+
+from pxr import Gf, Usd, UsdGeom
+
+
+VERSION = 3
+
+
+class WorldToParentCache():
+    """Persistent cache of inverted parent->world matrices, keyed by parent path and time code.
+    Prims sharing a parent share a single inversion.
+    Entries remain valid until invalidate() is called for a changed ancestor path, or clear().
+    """
+
+    MAX_TIME_CODES = 4  # scrubbing back and forth reuses recent time codes
+
+    def __init__(self):
+        self._time_mats = OrderedDict()  # {time_code: {parent_path: Gf.Matrix4d}}
+        self._subtree_parents = {}  # {Sdf.Path of a parent_path or ancestor: parent_paths at or below it}
+        self._xform_cache = None
+
+
+
+    def clear(self):
+        self._time_mats.clear()
+        self._subtree_parents.clear()
+        self._xform_cache = None
+
+
+
+    def get(self, prim, time_code=Usd.TimeCode.Default()):
+        """Returns the world->parent Gf.Matrix4d for prim."""
+
+        mats = self._time_mats.get(time_code)
+        if mats is None:
+            mats = self._time_mats[time_code] = {}
+            if len(self._time_mats) > WorldToParentCache.MAX_TIME_CODES:
+                self._time_mats.popitem(last=False)
+        else:
+            self._time_mats.move_to_end(time_code)
+
+        parent_path = prim.GetPath().GetParentPath()
+
+        mat = mats.get(parent_path)
+        if mat is None:
+            mat = self._get_xform_cache(time_code).GetParentToWorldTransform(prim).GetInverse()
+            mats[parent_path] = mat
+
+            path = parent_path
+            while not path.isEmpty:
+                self._subtree_parents.setdefault(path, set()).add(parent_path)
+                path = path.GetParentPath()
+
+        return mat
+
+
+
+    def invalidate(self, paths):
+        """Drop entries for parents at or below any of the changed Sdf.Path's.
+        In time proportional to the entries dropped."""
+
+        stale = set()
+        for path in paths:
+            if path.IsPropertyPath():
+                path = path.GetPrimPath()
+            stale.update(self._subtree_parents.get(path, ()))
+
+        if not stale:  # nor is any changed path in the XformCache, which only holds parent_paths and ancestors
+            return
+
+        for mats in self._time_mats.values():
+            for parent_path in stale:
+                mats.pop(parent_path, None)
+
+        for parent_path in stale:
+            path = parent_path
+            while not path.isEmpty:
+                parents = self._subtree_parents.get(path)
+                if parents is not None:
+                    parents.discard(parent_path)
+                    if not parents:
+                        del self._subtree_parents[path]
+                path = path.GetParentPath()
+
+        # UsdGeom.XformCache can't invalidate per path
+        if self._xform_cache is not None:
+            self._xform_cache.Clear()
+
+
+
+    def _get_xform_cache(self, time_code):
+        if self._xform_cache is None:
+            self._xform_cache = UsdGeom.XformCache(time_code)
+        elif self._xform_cache.GetTime() != time_code:
+            self._xform_cache.SetTime(time_code)  # clears if different
+
+        return self._xform_cache
+
+
+
+class UntransformedBoundCache():
+    """Persistent cache of prims' untransformed bounds (Gf.BBox3d), keyed by prim path, for one time code.
+    Xform changes of a prim or its ancestors don't change its untransformed bound: only changes below it do,
+    for which invalidate() must be called. Local and world bounds are then one transform away.
+    """
+
+    def __init__(self, purposes=[UsdGeom.Tokens.default_]):
+        self._purposes = purposes
+        self._bounds = {}  # {prim_path: Gf.BBox3d}
+        self._time_code = None
+        self._bbox_cache = None
+        self._bbox_cache_stale = False
+
+
+
+    def clear(self):
+        self._bounds.clear()
+        self._bbox_cache = None
+
+
+
+    def get(self, prim, time_code=Usd.TimeCode.Default(), cache=True):
+        """cache: False for prims whose bound can change without an invalidate(), as those with children moved by us.
+        Those are computed from scratch."""
+
+        if time_code != self._time_code:
+            self.clear()
+            self._time_code = time_code
+
+        path = prim.GetPath()
+
+        bound = self._bounds.get(path) if cache else None
+        if bound is None:
+            if self._bbox_cache is None:
+                self._bbox_cache = UsdGeom.BBoxCache(time_code, self._purposes)
+            elif self._bbox_cache_stale or not cache:  # UsdGeom.BBoxCache can't invalidate per path
+                self._bbox_cache.Clear()
+            self._bbox_cache_stale = not cache
+
+            bound = self._bbox_cache.ComputeUntransformedBound(prim)
+            if cache:
+                self._bounds[path] = bound
+
+        return bound
+
+
+
+    def invalidate(self, paths):
+        """Drop entries for these prim Sdf.Path's, something below them changed."""
+
+        for path in paths:
+            self._bounds.pop(path, None)
+            self._bbox_cache_stale = True
+
+
+
+    @staticmethod
+    def local_bound(bound, xform_cache, prim):
+        """bound: untransformed, to prim's parent space"""
+
+        lbb = Gf.BBox3d(bound)
+        lbb.Transform(xform_cache.GetLocalTransformation(prim)[0])
+        return lbb
+
+
+
+    @staticmethod
+    def world_bound(bound, xform_cache, prim):
+        wbb = Gf.BBox3d(bound)
+        wbb.Transform(xform_cache.GetLocalToWorldTransform(prim))
+        return wbb
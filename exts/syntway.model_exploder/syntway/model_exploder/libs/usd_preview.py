@@ -0,0 +1,53 @@
+"""
+Notes:
+"""
+
+from pxr import Sdf
+
+
+VERSION = 1
+
+
+class SessionPreviewLayer():
+    """An anonymous layer inserted as the strongest sublayer of the stage's session layer, for throwaway edits.
+    Its opinions aren't saved nor mark the stage dirty, and detaching drops all of them at once.
+    """
+
+    def __init__(self, tag="preview"):
+        self._tag = tag
+        self._stage = None
+        self._layer = None
+
+
+
+    @property
+    def layer(self):
+        return self._layer
+
+    def is_attached(self):
+        return self._layer is not None
+
+
+
+    def attach(self, stage):
+        self.detach()
+
+        self._layer = Sdf.Layer.CreateAnonymous(self._tag)
+        self._stage = stage
+
+        stage.GetSessionLayer().subLayerPaths.insert(0, self._layer.identifier)
+
+        return self._layer
+
+
+
+    def detach(self):
+        if self._layer is None:
+            return
+
+        sub_paths = self._stage.GetSessionLayer().subLayerPaths
+        if self._layer.identifier in sub_paths:
+            sub_paths.remove(self._layer.identifier)
+
+        self._stage = None
+        self._layer = None
@@ -8,10 +8,12 @@ import omni.usd
 from pxr import Gf, Sdf, Usd, UsdGeom
 
 
-VERSION = 15
+VERSION = 17
 
 XFORM_OP_TRANSLATE_TYPE_TOKEN = UsdGeom.XformOp.GetOpTypeToken(UsdGeom.XformOp.TypeTranslate)
 XFORM_OP_TRANSLATE_ATTR_NAME = "xformOp:" + XFORM_OP_TRANSLATE_TYPE_TOKEN
+XFORM_OP_ORDER_ATTR_NAME = UsdGeom.Tokens.xformOpOrder
+XFORM_OP_RESET_STACK_TOKEN = UsdGeom.XformOpTypes.resetXformStack
 
 
 def get_prim_transform(prim,
@@ -543,12 +545,21 @@ def create_edit_context(path, stage):
     """Unsafe from threading? No issues so far:
     https://graphics.pixar.com/usd/release/api/class_usd_edit_context.html#details
     """
+    layer = find_edit_layer(path, stage)
+    if layer is None:
+        return Usd.EditContext(stage)
+    else:
+        return Usd.EditContext(stage, Usd.EditTarget(layer))
+
+
+def find_edit_layer(path, stage):
+    """Layer in the session layer or its sublayers where path is defined, or None for the stage's edit target."""
     layer, prim = omni.usd.find_spec_on_session_or_its_sublayers(stage, path)
     if not prim or not layer:
-        return Usd.EditContext(stage)
+        return None
 
     if prim.specifier == Sdf.SpecifierDef:
-        return Usd.EditContext(stage, Usd.EditTarget(layer))
+        return layer
     else:
-        return Usd.EditContext(stage)
+        return None
 
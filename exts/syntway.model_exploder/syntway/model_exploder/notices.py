@@ -0,0 +1,88 @@
+"""
+Telling the stage notices sent by the engine's own writes from external edits: the property paths being written
+are recorded around each write and subtracted from the notices, instead of ignoring whole notices.
+"""
+
+from contextlib import contextmanager
+
+from .libs.usd_utils import XFORM_OP_TRANSLATE_ATTR_NAME, XFORM_OP_ORDER_ATTR_NAME
+from .explode_op import EXPLODE_OP_NAME
+
+
+# properties which adding or removing ops writes, besides the target attribute
+OP_NAMES = (XFORM_OP_TRANSLATE_ATTR_NAME, XFORM_OP_ORDER_ATTR_NAME)
+EXPLODE_OP_NAMES = (EXPLODE_OP_NAME, XFORM_OP_ORDER_ATTR_NAME)
+
+
+
+class SelfWrites():
+
+    def __init__(self):
+        self._paths = None  # Sdf.Path's of the properties being written, None when not writing
+
+
+
+    @contextmanager
+    def writing(self, paths):
+        """Notices sent inside this block for paths, property Sdf.Path's, are ours. Nestable."""
+
+        prev = self._paths
+        self._paths = set(paths) if prev is None else prev.union(paths)
+        try:
+            yield
+        finally:
+            self._paths = prev
+
+
+
+    @property
+    def active(self):
+        return self._paths is not None
+
+
+
+    def external(self, paths, is_own_prim):
+        """The notice paths not caused by the writes in progress: properties not being written,
+        and prims for which is_own_prim(path) is False, as a prim spec created or removed above a written property.
+        Returns paths itself when not writing."""
+
+        own = self._paths
+        if own is None:
+            return paths
+
+        return [p for p in paths if not (p in own if p.IsPropertyPath() else is_own_prim(p))]
+
+
+
+def plan_paths(plans, names=()):
+    """Property paths which writing plans sets: their target attributes, plus the named properties of each prim"""
+
+    paths = set()
+    for plan in plans:
+        if plan.attr_path is not None:
+            paths.add(plan.attr_path)
+        for name in names:
+            paths.add(plan.path.AppendProperty(name))
+
+    return paths
+
+
+
+def state_paths(state):
+    """Property paths which Engine.apply_state() writes for state"""
+
+    is_reset, changes, _, _, explode_op = state
+
+    if explode_op:
+        return plan_paths([plan for plan, _ in changes], EXPLODE_OP_NAMES)
+
+    if is_reset:  # snapshots restore their properties only
+        paths = set()
+        for plan, snapshot in changes:
+            paths.update(plan.path.AppendProperty(name) for name, *_ in snapshot.attrs)
+        return paths
+
+    paths = plan_paths([plan for plan, _ in changes if plan.attr_path is not None])
+    paths.update(plan_paths([plan for plan, _ in changes if plan.attr_path is None], OP_NAMES))  # ops to add
+
+    return paths
@@ -0,0 +1,329 @@
+"""
+Struct-of-arrays table for the parts being exploded: one row per part, with per-part values
+kept in contiguous numpy columns instead of one dict per part.
+Columns are read-only outside of PartTable, which patches changed rows in place and increments revision.
+Columns lent to work on other threads, see lend_affine_inputs(), are never patched: changes then replace them
+with a new version, so that the work never sees them change.
+"""
+
+import numpy as np
+
+from pxr import Gf, Sdf
+
+from .compute import AffineInputs
+
+
+class PartTable():
+
+    def __init__(self):
+        self.prims = []  # Usd.Prim
+        self.paths = []  # Sdf.Path, interned by Sdf
+        self.snapshots = []  # snapshot.XformSnapshot of initial xform values, for resetting
+        self.plans = []  # writer.WritePlan
+
+        self.ini_wtrans = np.zeros((0, 3))  # initial world centroids
+        self.ldelta = np.zeros((0, 3))  # local translation minus local centroid
+        self.ini_ltrans = np.zeros((0, 3))  # initial local translations
+        self.wbounds = np.zeros((0, 2, 3))  # initial world axis-aligned bounds: min, max
+        self.dist_lens = np.zeros(0)  # distances from explode center, which dist_order normalizes
+        self.dist_order = np.zeros(0)  # 0..1 distance order from explode center
+        self.w2p = np.zeros((0, 4, 4))  # world->parent matrices (inverse of parent->world)
+        self.w2p_time_code = None  # Usd.TimeCode when w2p was taken
+        self.part_parent = np.zeros(0, dtype=np.int64)  # row of nearest ancestor part, or -1
+        self.extent_bounded = np.zeros(0, dtype=bool)  # bounded by authored extent at capture, which recalcs keep
+
+        # dest_ltrans = dest_base + dist_factor * dest_vec, valid while affine_key matches
+        self.dest_base = np.zeros((0, 3))
+        self.dest_vec = np.zeros((0, 3))
+        self.dest_wvec = np.zeros((0, 3))  # world displacement per dist_factor
+        self.affine_key = None
+        self.revision = 0  # incremented when any input column is replaced
+
+        # last written, per part: an apply can be pre-empted after writing only some parts
+        self.written_values = np.zeros((0, 3))  # NaN if unknown
+        self.written_wdisps = np.zeros((0, 3))  # world displacement from the initial position
+        self.written_time_code = None
+
+        # explode op mode: explode op values at capture, written values are explode_base + dest_ltrans - ini_ltrans
+        self.explode_base = np.zeros((0, 3))
+        self.explode_ops = False  # if parts have explode ops
+        self.ops_added = False  # if translate ops were added to parts at capture, which a reset removes
+
+        self._rows = {}  # Sdf.Path: row
+        self._subtree_rows = {}  # Sdf.Path of a part or ancestor: rows of the parts at or below it
+        self._lent = []  # AffineInputs being read on other threads
+
+
+
+    def __len__(self):
+        return len(self.paths)
+
+
+
+    def set_rows(self, prims, ini_wtrans, ldelta, ini_ltrans, snapshots, w2p, plans, wbounds, extent_bounded):
+        """Fill the table from per-part lists, in row order."""
+
+        revision = self.revision
+        self.__init__()
+        self.revision = revision + 1
+
+        self.append_rows(prims, ini_wtrans, ldelta, ini_ltrans, snapshots, w2p, plans, wbounds, extent_bounded)
+
+
+
+    def append_rows(self, prims, ini_wtrans, ldelta, ini_ltrans, snapshots, w2p, plans, wbounds, extent_bounded):
+        """Add parts after the existing rows, from per-part lists. They are not displaced yet."""
+
+        count = len(prims)
+
+        self.prims = self.prims + list(prims)
+        self.paths = self.paths + [p.GetPath() for p in prims]
+        self.snapshots = self.snapshots + list(snapshots)
+        self.plans = self.plans + list(plans)
+
+        def append(column, values, shape):
+            return np.concatenate([column, np.array(values, dtype=np.float64).reshape((count,) + shape)])
+
+        self.ini_wtrans = _frozen(append(self.ini_wtrans, ini_wtrans, (3,)))
+        self.ldelta = _frozen(append(self.ldelta, ldelta, (3,)))
+        self.ini_ltrans = _frozen(append(self.ini_ltrans, ini_ltrans, (3,)))
+        self.wbounds = _frozen(append(self.wbounds, wbounds, (2, 3)))
+        self.w2p = _frozen(append(self.w2p, w2p, (4, 4)))
+        self.extent_bounded = _frozen(np.concatenate([self.extent_bounded, np.asarray(extent_bounded, dtype=bool)]))
+
+        self.explode_base = append(self.explode_base, np.zeros((count, 3)), (3,))
+        self.written_values = append(self.written_values, np.full((count, 3), np.nan), (3,))
+        self.written_wdisps = append(self.written_wdisps, np.zeros((count, 3)), (3,))
+
+        self._index()
+
+
+
+    def select_rows(self, rows):
+        """Keep only the given rows, in this order. Row indices change."""
+
+        rows = np.asarray(rows, dtype=np.int64)
+        row_list = rows.tolist()
+
+        self.prims = [self.prims[r] for r in row_list]
+        self.paths = [self.paths[r] for r in row_list]
+        self.snapshots = [self.snapshots[r] for r in row_list]
+        self.plans = [self.plans[r] for r in row_list]
+
+        self.ini_wtrans = _frozen(self.ini_wtrans[rows])
+        self.ldelta = _frozen(self.ldelta[rows])
+        self.ini_ltrans = _frozen(self.ini_ltrans[rows])
+        self.wbounds = _frozen(self.wbounds[rows])
+        self.w2p = _frozen(self.w2p[rows])
+        self.extent_bounded = _frozen(self.extent_bounded[rows])
+
+        self.explode_base = self.explode_base[rows]
+        self.written_values = self.written_values[rows]
+        self.written_wdisps = self.written_wdisps[rows]
+
+        self._index()
+
+
+
+    def _index(self):
+        """Row lookups and part_parent, after rows were added or removed"""
+
+        count = len(self.paths)
+
+        self._rows = {path: row for row, path in enumerate(self.paths)}
+
+        self.part_parent = np.full(count, -1, dtype=np.int64)
+        self._subtree_rows = {}
+        for row, path in enumerate(self.paths):
+            self._subtree_rows.setdefault(path, []).append(row)
+
+            parent = path.GetParentPath()
+            while not parent.isEmpty:
+                self._subtree_rows.setdefault(parent, []).append(row)
+
+                if self.part_parent[row] < 0 and parent != Sdf.Path.absoluteRootPath:
+                    anc = self._rows.get(parent)
+                    if anc is not None:
+                        self.part_parent[row] = anc
+
+                parent = parent.GetParentPath()
+        _frozen(self.part_parent)
+
+        self.dist_lens = np.zeros(count)  # computed with the affine terms
+        self.dist_order = np.zeros(count)
+        self.invalidate_affine()
+
+
+
+    def invalidate_affine(self):
+        """Call after changing any column the destination terms depend on."""
+        self.affine_key = None
+        self.revision += 1
+
+
+
+    def update_rows(self, rows, ini_wtrans, ldelta, ini_ltrans):
+        """Set rows of these columns to the given per-row values"""
+
+        self._patch("ini_wtrans", rows, ini_wtrans)
+        self._patch("ldelta", rows, ldelta)
+        self._patch("ini_ltrans", rows, ini_ltrans)
+
+        self.invalidate_affine()
+
+
+
+    def update_w2p(self, rows, w2p):
+        self._patch("w2p", rows, w2p)
+        self.invalidate_affine()
+
+
+
+    def affine_inputs(self, params):
+        """Inputs of compute.calc_affine() for state.ExplodeParams params, without copying"""
+
+        return AffineInputs(self.ini_wtrans, self.ldelta, self.w2p, self.part_parent, 
+                            params.center, params.center_mode, params.order_accel)
+
+
+
+    def lend_affine_inputs(self, params):
+        """affine_inputs() for another thread: their columns are not patched until return_affine_inputs()"""
+
+        inputs = self.affine_inputs(params)
+        self._lent.append(inputs)
+        return inputs
+
+
+
+    def return_affine_inputs(self, inputs):
+        self._lent = [lent for lent in self._lent if lent is not inputs]
+
+
+
+    def set_affine(self, key, dist_lens, dist_order, dest_base, dest_vec, dest_wvec):
+        self.dist_lens = _frozen(dist_lens)
+        self.dist_order = _frozen(dist_order)
+        self.dest_base = _frozen(dest_base)
+        self.dest_vec = _frozen(dest_vec)
+        self.dest_wvec = _frozen(dest_wvec)
+        self.affine_key = key
+
+
+
+    def update_affine_rows(self, key, rows, dist_lens, dist_order, dest_base, dest_vec, dest_wvec):
+        """Set rows of the set_affine() columns to the given per-row values"""
+
+        self._patch("dist_lens", rows, dist_lens)
+        self._patch("dist_order", rows, dist_order)
+        self._patch("dest_base", rows, dest_base)
+        self._patch("dest_vec", rows, dest_vec)
+        self._patch("dest_wvec", rows, dest_wvec)
+        self.affine_key = key
+
+
+
+    def written_wdisp(self, row):
+        """Current world displacement of a part, from the last written state."""
+        return self.written_wdisps[row]
+
+
+
+    def bounds(self):
+        """(min, max) of all parts' initial world bounds"""
+        return self.wbounds[:, 0].min(axis=0), self.wbounds[:, 1].max(axis=0)
+
+
+
+    def changed_rows(self, values, epsilon, time_code):
+        """Rows of (N,3) values which differ by more than epsilon from the last written ones."""
+
+        if time_code != self.written_time_code:
+            self.forget_written()
+            self.written_time_code = time_code
+
+        # NaN compares as changed
+        return np.flatnonzero(~(np.abs(values - self.written_values) <= epsilon).all(axis=1))
+
+
+
+    def record_written(self, rows, values, wdisps):
+        """values written for rows, displacing them by wdisps in world space"""
+        self.written_values[rows] = values
+        self.written_wdisps[rows] = wdisps
+
+
+
+    def record_reset(self):
+        """All parts were written back to their initial positions"""
+        self.forget_written()
+        self.written_wdisps.fill(0.)
+
+
+
+    def forget_written(self, rows=None):
+        """Parts to be written next time, whatever their values: all if rows is None."""
+        if rows is None:
+            self.written_values.fill(np.nan)
+        else:
+            self.written_values[rows] = np.nan
+
+
+
+    def rows_under(self, path):
+        """Rows of the parts at or below an Sdf.Path, by whole path elements: /a/b never matches /a/b1.
+        In time proportional to the rows returned."""
+        return self._subtree_rows.get(path, ())
+
+
+
+    def part_above(self, path):
+        """Row of the nearest part strictly above an Sdf.Path, or -1"""
+
+        path = path.GetParentPath()
+        while not path.isEmpty:
+            row = self._rows.get(path)
+            if row is not None:
+                return row
+            path = path.GetParentPath()
+
+        return -1
+
+
+
+    def row_of(self, path):
+        """Row index for an Sdf.Path or path string, or -1 if not a part."""
+        if isinstance(path, str):
+            path = Sdf.Path(path)
+        return self._rows.get(path, -1)
+
+
+
+    def _patch(self, name, rows, values):
+        """Set rows of a column in place, or in a new version if it is still read elsewhere"""
+
+        column = getattr(self, name)
+
+        shared = not column.flags.owndata or any(column is lent_column for lent in self._lent for lent_column in lent)
+        if shared:
+            column = np.array(column)
+
+        column.flags.writeable = True
+        column[rows] = np.asarray(values, dtype=np.float64).reshape((len(rows),) + column.shape[1:])
+        setattr(self, name, _frozen(column))
+
+
+
+    @staticmethod
+    def to_vec3d(row):
+        return Gf.Vec3d(*row.tolist())
+
+    @staticmethod
+    def to_matrix4d(row):
+        return Gf.Matrix4d(*row.ravel().tolist())
+
+
+
+def _frozen(a):
+    a.flags.writeable = False
+    return a
@@ -0,0 +1,124 @@
+"""
+Latest-value-wins apply scheduling: input changes between two updates coalesce into a single pending request,
+applied with the engine's current values, so intermediate slider values are never written.
+An apply is a job run in chunks under a per-update time budget, which a newer request pre-empts between chunks.
+"""
+
+import time
+
+
+class ApplyScheduler():
+
+    # inputs which changed since the last apply, as a mask. Applies read all current values: the engine's versions
+    # tell which precomputed terms are stale, which the mask can't, as parts also change by themselves
+    INPUT_DIST = 1
+    INPUT_CENTER = 2
+    INPUT_OPTIONS = 4  # center mode, acceleration, distance multiplier
+    INPUT_ALL = INPUT_DIST | INPUT_CENTER | INPUT_OPTIONS
+
+    WAIT = "wait"  # yielded by a job waiting for a background result: stops running until the next run()
+
+    def __init__(self, apply_fn):
+        """apply_fn(): returns a generator applying the current state, which yields between chunks"""
+
+        self._apply_fn = apply_fn
+
+        self._dirty = 0
+        self._request_time = 0.  # of the oldest pending request
+
+        self._job = None  # running apply generator
+        self._job_request_time = 0.  # of the oldest request it serves, pre-empted ones included
+
+        self.coalesced_count = 0  # requests merged into an already pending one
+        self.preempted_count = 0  # running applies dropped for a newer request
+        self.apply_count = 0
+        self.last_latency = 0.  # seconds from the oldest pending request to the end of its apply
+        self.last_cost = 0.  # seconds spent running the last finished apply, waits between updates excluded
+        self.avg_cost = 0.  # smoothed last_cost
+
+        self._job_cost = 0.
+
+
+
+    def request(self, inputs=INPUT_ALL):
+        if self._dirty:
+            self.coalesced_count += 1
+        else:
+            self._request_time = time.perf_counter()
+
+        self._dirty |= inputs
+
+
+
+    def is_pending(self):
+        return self._dirty != 0 or self._job is not None
+
+
+
+    def cancel(self):
+        self._dirty = 0
+        self._close_job()
+
+
+
+    COST_SMOOTHING = 0.5  # weight of the previous average cost
+
+    def run(self, budget=0.):
+        """Call once per update: starts the pending request, if any, pre-empting a running apply.
+        Then runs chunks for up to budget seconds, at least one. budget 0: no limit.
+        Returns True if anything was applied."""
+
+        if self._dirty:
+            if self._job is not None:
+                self._close_job()
+                self.preempted_count += 1
+            else:
+                self._job_request_time = self._request_time
+
+            self._dirty = 0
+
+            self._job = self._apply_fn()
+            self._job_cost = 0.
+
+        if self._job is None:
+            return False
+
+        start = time.perf_counter()
+
+        for step in self._job:
+            if step is ApplyScheduler.WAIT or (budget and time.perf_counter() - start >= budget):
+                self._job_cost += time.perf_counter() - start
+                return True  # continues on next update
+
+        end = time.perf_counter()
+
+        self._job = None
+
+        self.last_cost = self._job_cost + end - start
+        if self.apply_count:
+            self.avg_cost = self.avg_cost * ApplyScheduler.COST_SMOOTHING + \
+                            self.last_cost * (1. - ApplyScheduler.COST_SMOOTHING)
+        else:
+            self.avg_cost = self.last_cost
+
+        self.apply_count += 1
+        self.last_latency = end - self._job_request_time
+
+        return True
+
+
+
+    def _close_job(self):
+        if self._job is not None:
+            self._job.close()
+            self._job = None
+
+
+
+    def reset_stats(self):
+        self.coalesced_count = 0
+        self.preempted_count = 0
+        self.apply_count = 0
+        self.last_latency = 0.
+        self.last_cost = 0.
+        self.avg_cost = 0.
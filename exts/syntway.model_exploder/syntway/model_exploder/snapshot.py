@@ -0,0 +1,99 @@
+"""
+Raw authored xform values of parts, as found in the layers where they are written, to be restored exactly.
+"""
+
+from pxr import Sdf
+
+from .libs.usd_utils import XFORM_OP_TRANSLATE_ATTR_NAME, XFORM_OP_ORDER_ATTR_NAME
+
+
+class XformSnapshot():
+
+    def __init__(self, plan, stage):
+        target = stage.GetEditTarget() if plan.edit_layer is None else None
+
+        self.layer = plan.edit_layer if target is None else target.GetLayer()
+        self.prim_path = plan.path
+        if target is not None and not target.GetMapFunction().isIdentity:  # else no new path per part
+            self.prim_path = target.MapToSpecPath(plan.path)
+
+        prim_spec = self.layer.GetPrimAtPath(self.prim_path)
+        self.had_prim = prim_spec is not None
+
+        # the op order and all its ops, plus the translate op that writing might add
+        names = [XFORM_OP_ORDER_ATTR_NAME]
+        names += plan.op_names
+        if XFORM_OP_TRANSLATE_ATTR_NAME not in names:
+            names.append(XFORM_OP_TRANSLATE_ATTR_NAME)
+
+        # flat, as capture keeps one per part: (name, type_name, variability, default, samples),
+        # type_name None if not authored in layer
+        self.attrs = []
+        for name in names:
+            spec = prim_spec.attributes.get(name) if prim_spec is not None else None
+            if spec is None:
+                self.attrs.append((name, None, None, None, None))
+                continue
+
+            default = spec.default if spec.HasInfo("default") else None
+
+            path = spec.path
+            samples = {t: self.layer.QueryTimeSample(path, t) for t in self.layer.ListTimeSamplesForPath(path)}
+
+            self.attrs.append((name, spec.typeName, spec.variability, default, samples))
+
+
+
+    def restore(self):
+        """Write the snapshot values back into the layer. Call inside a Sdf.ChangeBlock."""
+
+        layer = self.layer
+
+        prim_spec = layer.GetPrimAtPath(self.prim_path)
+
+        for name, type_name, variability, default, samples in self.attrs:
+            spec = prim_spec.attributes.get(name) if prim_spec is not None else None
+
+            if type_name is None:  # wasn't authored here
+                if spec is not None:
+                    prim_spec.RemoveProperty(spec)
+                continue
+
+            if spec is None:
+                if prim_spec is None:
+                    prim_spec = Sdf.CreatePrimInLayer(layer, self.prim_path)
+                spec = Sdf.AttributeSpec(prim_spec, name, type_name, variability)
+
+            if default is None:
+                spec.ClearInfo("default")
+            else:
+                spec.default = default
+
+            path = spec.path
+            if spec.HasInfo("timeSamples"):
+                spec.ClearInfo("timeSamples")
+            for t, value in samples.items():
+                layer.SetTimeSample(path, t, value)
+
+        if not self.had_prim and prim_spec is not None:
+            layer.ScheduleRemoveIfInert(prim_spec)
+
+
+
+def restore_snapshots(changes):
+    """changes: list of (WritePlan, XformSnapshot). One change block per layer."""
+
+    groups = {}
+    for _, snapshot in changes:
+        groups.setdefault(snapshot.layer, []).append(snapshot)
+
+    for group in groups.values():
+        with Sdf.ChangeBlock():
+            for snapshot in group:
+                snapshot.restore()
+
+    for plan, _ in changes:  # copied time samples are gone
+        plan.localized_layer = None
+
+        if plan.attr is not None and not plan.attr.IsDefined():  # an op added by writing is gone
+            plan.attr = None
@@ -0,0 +1,37 @@
+"""
+Immutable, versioned explode parameters: a change makes a new ExplodeParams with a higher version, so that deferred
+or background work can hold on to the one it started with, without copying, and tell if it's stale.
+"""
+
+from collections import namedtuple
+
+
+# center is a 3-tuple. affine_version counts changes to the inputs of the parts' affine terms only.
+ExplodeParams = namedtuple("ExplodeParams",
+                           "version affine_version dist center center_mode order_accel dist_mult dist_base_size")
+
+_AFFINE_FIELDS = ("center", "center_mode", "order_accel")
+
+
+
+def make_params(center_mode, order_accel, dist_mult):
+    return ExplodeParams(version=0, affine_version=0, dist=0, center=(0., 0., 0.), center_mode=center_mode,
+                         order_accel=order_accel, dist_mult=dist_mult, dist_base_size=100)
+
+
+
+def evolve(params, **changes):
+    """A new version of params with changes. center can be any 3-sequence."""
+
+    if "center" in changes:
+        changes["center"] = tuple(float(c) for c in changes["center"])
+
+    changes = {name: value for name, value in changes.items() if getattr(params, name) != value}
+    if not changes:
+        return params
+
+    affine_version = params.affine_version
+    if any(name in changes for name in _AFFINE_FIELDS):
+        affine_version += 1
+
+    return params._replace(version=params.version + 1, affine_version=affine_version, **changes)
@@ -0,0 +1,4 @@
+from .test_resync import *
+from .test_preview import *
+from .test_scheduler import *
+from .test_undo import *
@@ -0,0 +1,61 @@
+"""
+Preview mode must move parts as the normal mode does, parts defined in the session layer included.
+"""
+
+import omni.kit.app
+import omni.kit.test
+import omni.usd
+
+from pxr import Gf, Usd, UsdGeom
+
+from ..engine import Engine
+
+
+
+class TestPreview(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._engine = Engine()
+
+
+
+    async def tearDown(self):
+        self._engine.destroy()
+        self._engine = None
+        await omni.usd.get_context().close_stage_async()
+
+
+
+    def _world_translations(self, paths):
+        xform_cache = UsdGeom.XformCache(Usd.TimeCode.Default())
+        return [xform_cache.GetLocalToWorldTransform(self._stage.GetPrimAtPath(path)).ExtractTranslation()
+                for path in paths]
+
+
+
+    async def test_session_layer_part(self):
+        stage = self._stage
+
+        UsdGeom.Xform.Define(stage, "/World")
+        paths = [f"/World/Cube{i}" for i in range(3)]
+        for i, path in enumerate(paths[:2]):
+            UsdGeom.Cube.Define(stage, path).AddTranslateOp().Set(Gf.Vec3d(i * 3., 0., 0.))
+
+        with Usd.EditContext(stage, stage.GetSessionLayer()):
+            UsdGeom.Cube.Define(stage, paths[2]).AddTranslateOp().Set(Gf.Vec3d(-2., 1., 0.))
+
+        before = self._world_translations(paths)
+
+        self._engine._preview = True
+        self.assertTrue(self._engine.sel_capture(["/World"]))
+
+        self._engine.dist = 0.5
+        for _ in range(2):
+            await omni.kit.app.get_app().next_update_async()
+
+        after = self._world_translations(paths)
+
+        for path, b, a in zip(paths, before, after):
+            self.assertGreater((a - b).GetLength(), 1e-3, path)
@@ -0,0 +1,120 @@
+"""
+Parts followed through prims added during a session must match a fresh capture of the same stage,
+and parts dropped on deactivation must be left where they started.
+Parts moved by others keep the bound source they were captured with.
+"""
+
+import omni.kit.app
+import omni.kit.test
+import omni.usd
+
+from pxr import Gf, Usd, UsdGeom
+
+from ..engine import Engine
+
+
+
+class TestResync(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._engine = Engine()
+
+
+
+    async def tearDown(self):
+        self._engine.destroy()
+        self._engine = None
+        await omni.usd.get_context().close_stage_async()
+
+
+
+    async def _update(self):
+        for _ in range(2):
+            await omni.kit.app.get_app().next_update_async()
+
+
+
+    async def test_added_under_pruned_prims(self):
+        stage = self._stage
+
+        UsdGeom.Xform.Define(stage, "/World")
+        for i in range(2):
+            UsdGeom.Cube.Define(stage, f"/World/Cube{i}").AddTranslateOp().Set((i * 3., 0., 0.))
+        UsdGeom.Camera.Define(stage, "/World/Camera")
+        UsdGeom.PointInstancer.Define(stage, "/World/Instancer")
+
+        self.assertTrue(self._engine.sel_capture(["/World"]))
+        self.assertEqual(self._engine.meshes_count, 3)
+
+        # inside prims whose children aren't looked into, and a new part
+        UsdGeom.Cube.Define(stage, "/World/Camera/Cube")
+        UsdGeom.Cube.Define(stage, "/World/Instancer/Cube")
+        UsdGeom.Cube.Define(stage, "/World/Cube2")
+        await self._update()
+
+        count = self._engine.meshes_count
+
+        self._engine.reset(False)
+        self.assertTrue(self._engine.sel_capture(["/World"]))
+
+        self.assertEqual(count, self._engine.meshes_count)
+        self.assertEqual(count, 4)
+
+
+
+    async def test_deactivated_part(self):
+        stage = self._stage
+
+        UsdGeom.Xform.Define(stage, "/World")
+        for i in range(3):
+            UsdGeom.Cube.Define(stage, f"/World/Cube{i}").AddTranslateOp().Set((i * 3., 0., 0.))
+
+        prim = stage.GetPrimAtPath("/World/Cube2")
+        before = UsdGeom.XformCache(Usd.TimeCode.Default()).GetLocalToWorldTransform(prim).ExtractTranslation()
+
+        self.assertTrue(self._engine.sel_capture(["/World"]))
+        self._engine.dist = 0.5
+        await self._update()
+
+        prim.SetActive(False)
+        await self._update()
+        self.assertEqual(self._engine.meshes_count, 2)
+
+        prim.SetActive(True)  # captured again as a new part
+        await self._update()
+        self.assertEqual(self._engine.meshes_count, 3)
+
+        self._engine.reset(True)
+
+        prim = stage.GetPrimAtPath("/World/Cube2")
+        after = UsdGeom.XformCache(Usd.TimeCode.Default()).GetLocalToWorldTransform(prim).ExtractTranslation()
+        self.assertTrue(Gf.IsClose(after, before, 1e-6))
+
+
+
+    async def test_moved_fast_bounds_part(self):
+        stage = self._stage
+
+        UsdGeom.Xform.Define(stage, "/World")
+        for i in range(3):
+            mesh = UsdGeom.Mesh.Define(stage, f"/World/Mesh{i}")
+            mesh.CreatePointsAttr([(0., 0., 0.), (1., 1., 1.)])
+            mesh.CreateExtentAttr([(0., 0., 0.), (1., 1., 1.)])
+            mesh.AddTranslateOp().Set((i * 3., 0., 0.))
+            # unlike the extent, which BBoxCache bounds by: tells the two sources apart
+            UsdGeom.ModelAPI.Apply(mesh.GetPrim()).SetExtentsHint([(-1., -1., -1.), (1., 1., 1.)])
+        UsdGeom.Imageable(stage.GetPrimAtPath("/World/Mesh2")).MakeInvisible()
+
+        self._engine._fast_bounds = True
+        self.assertTrue(self._engine.sel_capture(["/World"]))
+
+        parts = self._engine._parts
+        self.assertEqual(parts.extent_bounded.tolist(), [True, True, False])  # as BBoxCache: invisible, no bound
+        before = parts.ini_wtrans[0].copy()
+
+        UsdGeom.Xformable(stage.GetPrimAtPath("/World/Mesh0")).GetOrderedXformOps()[0].Set((10., 0., 0.))
+        await self._update()
+
+        self.assertTrue(Gf.IsClose(Gf.Vec3d(*(parts.ini_wtrans[0] - before)), Gf.Vec3d(10., 0., 0.), 1e-6))
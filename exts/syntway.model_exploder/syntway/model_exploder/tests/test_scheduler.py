@@ -0,0 +1,68 @@
+"""
+Applies pre-empted by newer requests, as when dragging the distance slider, must still move every part.
+"""
+
+from unittest import mock
+
+import omni.kit.test
+import omni.usd
+
+from pxr import Gf, Usd, UsdGeom
+
+from .. import const
+from ..engine import Engine
+
+
+
+class TestScheduler(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._engine = Engine()
+
+
+
+    async def tearDown(self):
+        self._engine.destroy()
+        self._engine = None
+        await omni.usd.get_context().close_stage_async()
+
+
+
+    def _world_translations(self, paths):
+        xform_cache = UsdGeom.XformCache(Usd.TimeCode.Default())
+        return [xform_cache.GetLocalToWorldTransform(self._stage.GetPrimAtPath(path)).ExtractTranslation()
+                for path in paths]
+
+
+
+    async def test_preempted_applies(self):
+        stage = self._stage
+        engine = self._engine
+
+        UsdGeom.Xform.Define(stage, "/World")
+        paths = [f"/World/Cube{i}" for i in range(100)]
+        for i, path in enumerate(paths):
+            UsdGeom.Cube.Define(stage, path).AddTranslateOp().Set(Gf.Vec3d(i * 3., 0., 0.))
+
+        before = self._world_translations(paths)
+
+        self.assertTrue(engine.sel_capture(["/World"]))
+
+        engine._immediate_apply = 0.
+        engine._apply_budget = 1e-9  # a single chunk per update
+
+        with mock.patch.object(const, "APPLY_CHUNK_SIZE", 10):
+            frames = 12
+            for frame in range(frames):  # each request pre-empts the previous apply after one chunk
+                engine.dist = 0.2 + frame * 0.01
+                engine._scheduler.run(engine._apply_budget)
+
+        self.assertEqual(engine._scheduler.preempted_count, frames - 1)
+        self.assertEqual(engine._scheduler.apply_count, 0)
+
+        after = self._world_translations(paths)
+
+        for path, b, a in zip(paths, before, after):
+            self.assertGreater((a - b).GetLength(), 1e-3, path)
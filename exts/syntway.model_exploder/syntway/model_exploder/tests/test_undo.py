@@ -0,0 +1,66 @@
+"""
+Undoing and redoing an applied explode must work after a part was deleted and its deletion undone.
+"""
+
+import omni.kit.app
+import omni.kit.commands
+import omni.kit.test
+import omni.kit.undo
+import omni.usd
+
+from pxr import Gf, Usd, UsdGeom
+
+from ..engine import Engine
+
+
+
+class TestUndo(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._engine = Engine()
+
+
+
+    async def tearDown(self):
+        self._engine.destroy()
+        self._engine = None
+        await omni.usd.get_context().close_stage_async()
+
+
+
+    def _world_translation(self, path):
+        xform_cache = UsdGeom.XformCache(Usd.TimeCode.Default())
+        return xform_cache.GetLocalToWorldTransform(self._stage.GetPrimAtPath(path)).ExtractTranslation()
+
+
+
+    async def test_undo_after_undeleted_part(self):
+        stage = self._stage
+
+        UsdGeom.Xform.Define(stage, "/World")
+        for i in range(3):
+            UsdGeom.Cube.Define(stage, f"/World/Cube{i}").AddTranslateOp().Set(Gf.Vec3d(i * 3., 0., 0.))
+
+        path = "/World/Cube2"
+        before = self._world_translation(path)
+
+        self.assertTrue(self._engine.sel_capture(["/World"]))
+        self._engine.dist = 0.5
+        for _ in range(2):
+            await omni.kit.app.get_app().next_update_async()
+        self._engine.commit()
+
+        exploded = self._world_translation(path)
+        self.assertGreater((exploded - before).GetLength(), 1e-3)
+
+        omni.kit.commands.execute("DeletePrims", paths=[path])
+        omni.kit.undo.undo()  # the part's prim is back, under new handles
+        self.assertTrue(stage.GetPrimAtPath(path).IsValid())
+
+        omni.kit.undo.undo()  # the explode
+        self.assertTrue(Gf.IsClose(self._world_translation(path), before, 1e-6))
+
+        omni.kit.undo.redo()
+        self.assertTrue(Gf.IsClose(self._world_translation(path), exploded, 1e-6))
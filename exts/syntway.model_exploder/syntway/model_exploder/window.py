@@ -45,6 +45,8 @@ class Window(ui.Window):
         self._center_label_transform = None
         self._base_aabb_lines = []
 
+        self._options_apply_mode_label = None
+
         self._options_bounds_alpha = get_setting_or(const.SETTINGS_PATH + const.OPTIONS_BOUNDS_ALPHA_SETTING, 
                                                     const.OPTIONS_BOUNDS_ALPHA_DEFAULT)
         self._options_unselect_on_use = get_setting_or(const.SETTINGS_PATH + const.OPTIONS_UNSELECT_ON_USE_SETTING, 
@@ -113,7 +115,7 @@ class Window(ui.Window):
             if self._engine.usd:
                 self._engine.usd.remove_stage_event_fn(self._on_stage_event)
 
-            if not is_ext_shutdown and self._engine.has_meshes and self._engine.dist != 0:
+            if not is_ext_shutdown and self._engine.has_meshes and self._engine.needs_reset:
                 self._engine.reset(True)  # cancel current to intial positions
 
             self._engine.destroy()
@@ -192,7 +194,7 @@ class Window(ui.Window):
                             with ui.HStack():
                                 self._options_accel_slider = ui.FloatSlider(min=0, max=const.OPTIONS_ACCEL_MAX)
 
-                                self._options_accel_slider.model.set_value(self._engine._order_accel)
+                                self._options_accel_slider.model.set_value(self._engine.order_accel)
                                 self._options_accel_slider.model.add_value_changed_fn(self._on_options_accel_changed)
                                 
                                 create_reset_button(const.ACCEL_DEFAULT,
@@ -267,6 +269,14 @@ class Window(ui.Window):
                                                     self._options_unselect_on_use_check.model.add_value_changed_fn)
 
 
+                        with ui.HStack(spacing=6):
+                            ui.Label(const.OPTIONS_APPLY_MODE_LABEL,
+                                     tooltip_fn=create_tooltip_fn(const.TOOLTIP_OPTIONS_APPLY_MODE))
+
+                            self._options_apply_mode_label = ui.Label("",
+                                tooltip_fn=create_tooltip_fn(const.TOOLTIP_OPTIONS_APPLY_MODE))
+
+
                 ui.Spacer(height=1)
 
                 with ui.HStack(skip_draw_when_clipped=True, spacing=9):
@@ -340,6 +350,24 @@ class Window(ui.Window):
             self._done_button.enabled = True
             self._reset_button.enabled = True
 
+        self._refresh_apply_mode()
+
+
+
+    def _refresh_apply_mode(self):
+        if not self._options_apply_mode_label:
+            return
+
+        scheduler = self._engine.scheduler
+        if not scheduler.apply_count:
+            text = const.OPTIONS_APPLY_MODE_UNKNOWN_TEXT
+        elif self._engine.is_apply_immediate:
+            text = const.OPTIONS_APPLY_MODE_IMMEDIATE_TEXT.format(scheduler.avg_cost * 1000.)
+        else:
+            text = const.OPTIONS_APPLY_MODE_DEFERRED_TEXT.format(scheduler.avg_cost * 1000.)
+
+        self._options_apply_mode_label.text = text
+
 
     def _setup_center_combo_labels(self):
         model = self._center_mode_combo.model
@@ -404,6 +432,7 @@ class Window(ui.Window):
 
     def _on_dist_slider_changed(self, model):
         self._engine.dist = model.as_float
+        self._refresh_apply_mode()
 
 
     def _on_center_mode_changed(self, m, *args):        
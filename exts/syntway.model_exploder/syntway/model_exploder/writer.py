@@ -0,0 +1,269 @@
+"""
+Per-part translation write plans: what set_prim_translation() finds on each call is resolved once at capture,
+so that writing a part becomes a single attribute set.
+"""
+
+import omni.usd
+
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from .libs.usd_utils import (find_edit_layer, is_pivot_xform_op_name_suffix, 
+                             XFORM_OP_TRANSLATE_ATTR_NAME, XFORM_OP_ORDER_ATTR_NAME, XFORM_OP_RESET_STACK_TOKEN)
+
+
+_PRECISION_VEC3_TYPES = {
+    UsdGeom.XformOp.PrecisionDouble: Gf.Vec3d,
+    UsdGeom.XformOp.PrecisionFloat: Gf.Vec3f,
+    UsdGeom.XformOp.PrecisionHalf: Gf.Vec3h,
+}
+
+
+class WritePlan():
+
+    def __init__(self, prim, stage, time_code):
+        self.prim = prim
+        self.path = prim.GetPath()
+
+        # explode op mode, see explode_op.py
+        self.explode_attr = None  # Usd.Attribute of the explode op, while present
+        self.explode_added = False  # added by add_explode_ops(), else already there
+        self.explode_prev_order = None  # xformOpOrder in the op's layer before adding, None if none
+        self.explode_spec = None
+        self.explode_spec_layer = None
+
+        self.attr_path = None
+        self.localized_layer = None  # layer where attr's weaker time samples were copied to, once per session
+
+        self.resolve(stage, time_code)
+
+
+
+    def resolve(self, stage, time_code):
+        """Find the target op as set_prim_translation() does: the first transform or non-pivot translate op"""
+
+        prev_attr_path = self.attr_path
+
+        self.attr = None  # op attribute to write, None if the prim needs a translate op
+        self.type_name = None  # Sdf.ValueTypeName of attr
+        self.attr_path = None
+        self.attr_spec = None  # Sdf.AttributeSpec last written by write_plans_sdf(), in attr_spec_layer
+        self.attr_spec_layer = None
+        self.is_matrix = False  # a transform op: only its translation is replaced
+        self.precision = UsdGeom.XformOp.PrecisionDouble
+        self.value_type = Gf.Vec3d  # preserves the existing value type
+        self.time_sampled = False
+        self.edit_layer = find_edit_layer(self.path, stage)  # None: stage's edit target
+        self.fast = False  # if set_prim_translation_fast() would be safe
+
+        self.mat = None  # transform op value
+        self.translation = Gf.Vec3d(0.)  # current translation
+
+        xform = UsdGeom.Xformable(self.prim)
+        ops = xform.GetOrderedXformOps()
+
+        self.op_names = [op.GetName() for op in ops if not op.IsInverseOp()]  # op attributes, in order
+
+        for op in ops:
+            op_type = op.GetOpType()
+            if op_type == UsdGeom.XformOp.TypeTransform:
+                self.attr = op.GetAttr()
+                self.is_matrix = True
+                break
+            elif op_type == UsdGeom.XformOp.TypeTranslate and not is_pivot_xform_op_name_suffix(op.GetOpName()):
+                self.attr = op.GetAttr()
+                break
+
+        if self.attr is None:
+            self.localized_layer = None
+            return
+
+        self.type_name = self.attr.GetTypeName()
+        self.attr_path = self.attr.GetPath()
+
+        if self.attr_path != prev_attr_path:
+            self.localized_layer = None
+        self.precision = op.GetPrecision()
+        self.time_sampled = self.attr.GetNumTimeSamples() > 0
+
+        value = self.attr.Get(time_code)
+
+        if self.is_matrix:
+            self.value_type = Gf.Matrix4d
+            self.mat = Gf.Matrix4d(value) if value is not None else Gf.Matrix4d(1.)
+            self.translation = self.mat.ExtractTranslation()
+
+        else:
+            if value is not None:
+                self.value_type = type(value)
+                self.translation = Gf.Vec3d(value)
+            else:
+                self.value_type = _PRECISION_VEC3_TYPES.get(self.precision, Gf.Vec3d)
+
+            self.fast = not self.time_sampled
+
+
+
+    def make_value(self, trans, time_code):
+        """Attribute value for translation trans, a 3-sequence. Needs attr."""
+
+        if self.is_matrix:
+            mat = self.attr.Get(time_code) if self.time_sampled else self.mat
+            value = Gf.Matrix4d(mat)
+            value.SetTranslateOnly(Gf.Vec3d(*trans))
+            return value
+        else:
+            return self.value_type(*trans)
+
+
+
+    def localize_time_samples(self, stage, layer):
+        """Copy attr's time samples from weaker layers into layer, the first time only.
+        Call in layer's edit context."""
+
+        if self.localized_layer != layer:
+            omni.usd.copy_timesamples_from_weaker_layer(stage, self.attr)
+            self.localized_layer = layer
+
+
+
+    def write(self, trans, time_code, stage, layer):
+        """Set translation trans, a 3-sequence. Needs attr. Call in the edit context of layer."""
+
+        value = self.make_value(trans, time_code)
+
+        if self.time_sampled:
+            self.localize_time_samples(stage, layer)
+            self.attr.Set(value, time_code)
+        else:
+            self.attr.Set(value)
+
+
+
+def write_plans(changes, time_code, stage, layer=None):
+    """changes: list of (WritePlan, translation). Grouped by edit layer, all in a single change block.
+    layer: if given, all changes are written into this layer instead.
+    """
+
+    _add_missing_translate_ops(changes, time_code, stage, layer)
+
+    groups = group_by_layer(changes, layer)
+
+    with Sdf.ChangeBlock():
+        for group_layer, group in groups.items():
+            target = Usd.EditTarget(group_layer) if group_layer is not None else stage.GetEditTarget()
+            target_layer = target.GetLayer()
+
+            with Usd.EditContext(stage, target):
+                for plan, trans in group:
+                    plan.write(trans, time_code, stage, target_layer)
+
+
+
+def write_plans_sdf(changes, time_code, stage, layer=None):
+    """As write_plans(), but setting the attribute specs directly in each target layer through the Sdf API,
+    with one change block per layer.
+    """
+
+    _add_missing_translate_ops(changes, time_code, stage, layer)
+
+    groups = group_by_layer(changes, layer)
+
+    sample_time = None if time_code.IsDefault() else time_code.GetValue()
+
+    for group_layer, group in groups.items():
+        target = Usd.EditTarget(group_layer) if group_layer is not None else stage.GetEditTarget()
+        target_layer = target.GetLayer()
+        map_paths = not target.GetMapFunction().isIdentity  # variant edit targets
+
+        # Usd reads and first time sample copies must happen outside the Sdf change block
+        sampled_values = {}
+        if sample_time is not None:
+            with Usd.EditContext(stage, target):
+                for plan, trans in group:
+                    if plan.time_sampled:
+                        plan.localize_time_samples(stage, target_layer)
+                        sampled_values[plan] = plan.make_value(trans, time_code)
+
+        with Sdf.ChangeBlock():
+            for plan, trans in group:
+
+                spec = plan.attr_spec
+                if spec is None or spec.expired or plan.attr_spec_layer != target_layer:
+                    spec_path = target.MapToSpecPath(plan.attr_path) if map_paths else plan.attr_path
+                    spec = target_layer.GetAttributeAtPath(spec_path)
+                    if spec is None:
+                        prim_spec = Sdf.CreatePrimInLayer(target_layer, spec_path.GetPrimPath())  # an over if not defined
+                        spec = Sdf.AttributeSpec(prim_spec, spec_path.name, plan.type_name)
+
+                    plan.attr_spec = spec
+                    plan.attr_spec_layer = target_layer
+
+                if plan in sampled_values:
+                    target_layer.SetTimeSample(spec.path, sample_time, sampled_values[plan])
+                else:
+                    spec.default = plan.make_value(trans, time_code)
+
+
+
+def add_translate_ops(plans, time_code, stage, layer=None):
+    """Insert a translate op first in the op order of each plan's prim, all in one batch with a change block
+    per layer, instead of set_prim_translation()'s order rewrite per prim. Plans are resolved to the new ops.
+    layer: if given, all ops are added there instead of in the plans' edit layers.
+    """
+
+    added = []
+
+    for plan in plans:
+        order = UsdGeom.Xformable(plan.prim).GetXformOpOrderAttr().Get()
+        order = list(order) if order else []
+
+        if XFORM_OP_TRANSLATE_ATTR_NAME in order:
+            continue
+
+        at = 1 if order and order[0] == XFORM_OP_RESET_STACK_TOKEN else 0
+        order.insert(at, XFORM_OP_TRANSLATE_ATTR_NAME)
+
+        added.append((plan, order))
+
+    for group_layer, group in group_by_layer(added, layer).items():
+        target = Usd.EditTarget(group_layer) if group_layer is not None else stage.GetEditTarget()
+        target_layer = target.GetLayer()
+
+        with Sdf.ChangeBlock():
+            for plan, order in group:
+                prim_spec = Sdf.CreatePrimInLayer(target_layer, target.MapToSpecPath(plan.path))
+
+                order_spec = prim_spec.attributes.get(XFORM_OP_ORDER_ATTR_NAME)
+                if order_spec is None:
+                    order_spec = Sdf.AttributeSpec(prim_spec, XFORM_OP_ORDER_ATTR_NAME, 
+                                                   Sdf.ValueTypeNames.TokenArray, Sdf.VariabilityUniform)
+                order_spec.default = order
+
+                op_spec = prim_spec.attributes.get(XFORM_OP_TRANSLATE_ATTR_NAME)
+                if op_spec is None:
+                    op_spec = Sdf.AttributeSpec(prim_spec, XFORM_OP_TRANSLATE_ATTR_NAME, Sdf.ValueTypeNames.Double3)
+                op_spec.default = Gf.Vec3d(0.)
+
+    for plan, _ in added:
+        plan.resolve(stage, time_code)
+
+
+
+def _add_missing_translate_ops(changes, time_code, stage, layer):
+    """Normally done at capture: here for undo/redo and after the preview layer is gone"""
+
+    missing = [plan for plan, _ in changes if plan.attr is None]
+    if missing:
+        add_translate_ops(missing, time_code, stage, layer)
+
+
+
+def group_by_layer(changes, layer):
+    if layer is not None:
+        return {layer: changes}
+
+    groups = {}
+    for ch in changes:
+        groups.setdefault(ch[0].edit_layer, []).append(ch)
+
+    return groups